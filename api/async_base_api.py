@@ -0,0 +1,227 @@
+import asyncio
+import itertools
+import json
+import time
+from datetime import timedelta
+from urllib.parse import urlencode, urlsplit
+
+from requests.structures import CaseInsensitiveDict
+
+from api.base_api import ResponseValidationMixin
+from utils import latency
+from utils.config import Config
+
+
+# Response returned by AsyncBaseAPI, exposing the parts of requests.Response the tests use
+class AsyncResponse:
+
+    def __init__(self, status_code, reason, headers, content, url, elapsed=None):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.elapsed = elapsed
+        self._json = None
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    # The body is decoded once; later calls return the same object
+    def json(self):
+        if self._json is None:
+            self._json = json.loads(self.content)
+        return self._json
+
+
+# A single HTTP/1.1 connection that can be reused while the server keeps it open
+class _Connection:
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self):
+        self.writer.close()
+
+    async def request(self, method, target, host, headers, body):
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append(f"Content-Length: {len(body)}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before the response arrived")
+        version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+
+        response_headers = CaseInsensitiveDict()
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip()] = value.strip()
+
+        status = int(status)
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            content = b''
+        elif 'chunked' in response_headers.get('Transfer-Encoding', '').lower():
+            content = await self._read_chunked()
+        elif 'Content-Length' in response_headers:
+            content = await self.reader.readexactly(int(response_headers['Content-Length']))
+        else:
+            content = await self.reader.read()
+
+        connection = response_headers.get('Connection', '').lower()
+        keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+        return status, reason, response_headers, content, keep_alive
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b';', 1)[0], 16)
+            if size == 0:
+                # Skip trailers up to the blank line that ends the body
+                while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+
+# Keep-alive connection pool shared by every AsyncBaseAPI built on it.
+# At most `limit` requests are in flight at once; idle connections are reused LIFO.
+class AsyncConnectionPool:
+
+    def __init__(self, limit=100, timeout=30):
+        self.limit = limit
+        self.timeout = timeout
+        self._idle = {}
+        self._semaphore = None
+
+    async def _acquire(self, scheme, host, port):
+        idle = self._idle.get((scheme, host, port))
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof():
+                conn.reused = True
+                return conn
+            conn.close()
+        reader, writer = await asyncio.open_connection(host, port, ssl=(scheme == 'https') or None)
+        return _Connection(reader, writer)
+
+    def _release(self, key, conn, keep_alive):
+        if keep_alive:
+            self._idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
+
+    # Send one request, retrying once if a reused connection turned out to be stale
+    async def request(self, method, url, headers, body=b''):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = parts.path or '/'
+        if parts.query:
+            target += f"?{parts.query}"
+
+        async with self._semaphore:
+            for attempt in range(2):
+                started = time.perf_counter()
+                conn = await self._acquire(*key)
+                try:
+                    status, reason, response_headers, content, keep_alive = await asyncio.wait_for(
+                        conn.request(method, target, parts.netloc, headers, body), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                    conn.close()
+                    if conn.reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    conn.close()
+                    raise
+                self._release(key, conn, keep_alive)
+                return AsyncResponse(status, reason, response_headers, content, url,
+                                     timedelta(seconds=time.perf_counter() - started))
+
+    # Close every idle connection
+    async def close(self):
+        idle, self._idle = self._idle, {}
+        for conn in itertools.chain.from_iterable(idle.values()):
+            conn.close()
+
+
+class AsyncBaseAPI(ResponseValidationMixin):
+    # Initialize the async base API; pass a shared pool to reuse connections across clients
+    def __init__(self, base_url=None, pool=None, limit=100):
+        self.base_url = base_url or Config.MOCK_API_URL
+        self.pool = pool or AsyncConnectionPool(limit=limit)
+        self.headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        }
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    # Close the idle connections held by the pool
+    async def close(self):
+        await self.pool.close()
+
+    # Make a request and log it like BaseAPI does
+    async def request(self, method, endpoint, params=None, data=None, headers=None):
+        url = f"{self.base_url}{endpoint}"
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        body = json.dumps(data).encode('utf-8') if data else b''
+        response = await self.pool.request(method, url, {**self.headers, **(headers or {})}, body)
+        latency.record(method, url, response.elapsed.total_seconds())
+        self._log_request_response(method, url, response, data=data, params=params)
+        return response
+
+    # Make a GET request
+    async def get(self, endpoint, params=None, headers=None):
+        return await self.request("GET", endpoint, params=params, headers=headers)
+
+    # Make a POST request
+    async def post(self, endpoint, data=None, headers=None):
+        return await self.request("POST", endpoint, data=data, headers=headers)
+
+    # Make a PUT request
+    async def put(self, endpoint, data=None, headers=None):
+        return await self.request("PUT", endpoint, data=data, headers=headers)
+
+    # Make a DELETE request
+    async def delete(self, endpoint, headers=None):
+        return await self.request("DELETE", endpoint, headers=headers)
+
+    # POST rows to a bulk endpoint in chunks and merge the per-row results
+    async def post_bulk(self, endpoint, key, rows, chunk_size=500):
+        results = []
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            response = await self.post(endpoint, data={key: chunk})
+            self.validate_status_code(response, 200)
+            offset = len(results)
+            for result in response.json()['results']:
+                result['index'] += offset
+                results.append(result)
+
+        created = sum(1 for result in results if result['status_code'] == 201)
+        return {'results': results, 'created': created, 'failed': len(results) - created}
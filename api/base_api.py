@@ -1,31 +1,98 @@
+import itertools
+import os
 import requests
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from trio_websocket import Endpoint
+from api import response_schemas, session_registry
+from api.retry_policy import RetryPolicy, record_retry_stat
+from utils import latency, request_log
 from utils.config import Config
 
-class BaseAPI:
-    # Initialize the base API
-    def __init__(self, base_url="http://localhost:5000/api"):
-        self.base_url = base_url
-        self.session = requests.Session()
+# Logging and validation shared by the sync and async API clients
+class ResponseValidationMixin:
+
+    # Record the exchange in the request log; latency is recorded where the call is timed.
+    # A streamed body is left for the caller and not captured.
+    def _log_request_response(self, method, url, response, data=None, params=None, stream=False):
+        request_log.record(method, url, response, data=data, params=params, stream=stream)
+
+    # Validate the status code
+    def validate_status_code(self, response, expected_status):
+        assert response.status_code == expected_status, \
+            f"Status code is not correct. Expected: {expected_status}. Actual: {response.status_code}"
+
+    # Validate the JSON body against a declared Schema (see api.response_schemas)
+    # or a list of required top-level fields, and return the parsed body
+    def validate_json_schema(self, response, schema):
+        return response_schemas.validate(response, schema)
+
+
+class BaseAPI(ResponseValidationMixin):
+
+    # Default number of threads used by fan_out
+    FAN_OUT_WORKERS = int(os.getenv("API_FAN_OUT_WORKERS", "8"))
+
+    # Initialize the base API; retry_policy decides which failed requests are retried
+    def __init__(self, base_url=None, retry_policy=None):
+        self.base_url = base_url or Config.MOCK_API_URL
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Borrow the process-wide session so connections are reused across clients
+        self.session = session_registry.get_session(self.base_url)
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
 
-    # Make a GET request
-    def get(self, endpoint, params=None, **kwargs):
+    # Send a request, retrying transient failures the retry policy allows. Every
+    # attempt that gets a response from the server (not from a cassette) is timed
+    # as a whole, body download included; response.elapsed stops once the headers
+    # are parsed. With stream=True the body is left unread for the caller, so the
+    # attempt is timed up to the headers.
+    def _send(self, method, url, stream=False, **kwargs):
+        policy = self.retry_policy
+        retries = policy.retries_for(method, kwargs.get('headers'))
+        retry_number = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, stream=stream, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if retry_number == retries:
+                    if retries:
+                        record_retry_stat('retries_exhausted')
+                    raise
+            else:
+                if not getattr(response, 'replayed', False):
+                    latency.record(method, url, time.perf_counter() - started)
+                if response.headers.get('Idempotent-Replayed') == 'true':
+                    record_retry_stat('deduped_responses')
+                if not policy.should_retry_status(response.status_code):
+                    return response_schemas.memoize_json(response)
+                if retry_number == retries:
+                    if retries:
+                        record_retry_stat('retries_exhausted')
+                    return response_schemas.memoize_json(response)
+                # Hand the connection back before retrying, even if the body was not read
+                response.close()
+            record_retry_stat('retries')
+            time.sleep(policy.backoff(retry_number))
+            retry_number += 1
+
+    # Make a GET request; with stream=True the caller reads and closes the response
+    def get(self, endpoint, params=None, stream=False, **kwargs):
         url = f"{self.base_url}{endpoint}"
-        response = self.session.get(url, params=params, **kwargs)
-        self._log_request_response("GET", url, response, params=params)
+        response = self._send("GET", url, params=params, stream=stream, **kwargs)
+        self._log_request_response("GET", url, response, params=params, stream=stream)
         return response
     
     # Make a POST request
     def post(self, endpoint, data=None, **kwargs):
         url = f"{self.base_url}{endpoint}"
         json_data = json.dumps(data) if data else None
-        response = self.session.post(url, data=json_data, **kwargs)
+        response = self._send("POST", url, data=json_data, **kwargs)
         self._log_request_response("POST", url, response, data=data)
         return response
     
@@ -33,44 +100,60 @@ class BaseAPI:
     def put(self, endpoint, data=None, **kwargs):
         url = f"{self.base_url}{endpoint}"
         json_data = json.dumps(data) if data else None
-        response = self.session.put(url, data=json_data, **kwargs)
+        response = self._send("PUT", url, data=json_data, **kwargs)
         self._log_request_response("PUT", url, response, data=data)
         return response
     
     # Make a DELETE request
     def delete(self, endpoint, **kwargs):
         url = f"{self.base_url}{endpoint}"
-        response = self.session.delete(url, **kwargs)
+        response = self._send("DELETE", url, **kwargs)
         self._log_request_response("DELETE", url, response)
         return response
     
-    # Log request and response details
-    def _log_request_response(self, method, url, response, data=None, params=None):
-        print(f"\n{'='*50}")
-        print(f"{method} {url}")
-        if params:
-            print(f"Params: {params}")
-        if data:
-            print(f"Data: {data}")
-        print(f"Status code: {response.status_code}")
-        try:
-            response_json = response.json()
-            print(f"Response: {json.dumps(response_json, indent=4)}")
-        except:
-            print(f"Response: {response.text}")
-        print(f"{'='*50}\n")
+    # POST rows to a bulk endpoint in chunks and merge the per-row results
+    def post_bulk(self, endpoint, key, rows, chunk_size=500):
+        results = []
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            response = self.post(endpoint, data={key: chunk})
+            self.validate_status_code(response, 200)
+            offset = len(results)
+            for result in response.json()['results']:
+                result['index'] += offset
+                results.append(result)
 
-    # Validate the status code
-    def validate_status_code(self, response, expected_status):
-        assert response.status_code == expected_status, \
-            f"Status code is not correct. Expected: {expected_status}. Actual: {response.status_code}"
+        created = sum(1 for result in results if result['status_code'] == 201)
+        return {'results': results, 'created': created, 'failed': len(results) - created}
+
+    # Call func(item) for every item on a bounded thread pool. Outcomes are
+    # (value, error) pairs in input order; an exception is kept for its item
+    # instead of stopping the rest of the batch.
+    def fan_out(self, func, items, max_workers=None):
+        items = list(items)
+        if not items:
+            return []
+
+        def call(item):
+            try:
+                return func(item), None
+            except Exception as error:
+                return None, error
+
+        workers = min(max_workers or self.FAN_OUT_WORKERS, len(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fan-out") as executor:
+            return list(executor.map(call, items))
+
+    # Run a request per item concurrently and summarize the responses like post_bulk
+    def _fan_out_requests(self, func, items, expected_status, max_workers=None):
+        results = []
+        for index, (response, error) in enumerate(self.fan_out(func, items, max_workers)):
+            results.append({'index': index, 'response': response, 'error': error})
+
+        created = sum(1 for result in results
+                      if result['response'] is not None and result['response'].status_code == expected_status)
+        return {'results': results, 'created': created, 'failed': len(results) - created}
 
-    # Validate the JSON schema        
-    def validate_json_schema(self, response, required_fields):
-        try:
-            json_data = response.json()
-            for field in required_fields:
-                assert field in json_data, f"JSON schema is not correct. Missing field: {field}"
-            return json_data
-        except json.JSONDecodeError:
-            raise AssertionError(f"JSON schema is not correct. Response: {response.text}")
\ No newline at end of file
@@ -0,0 +1,215 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import uuid
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from api import session_registry
+from api.session_registry import TunedHTTPAdapter
+
+# Record/replay transport for BaseAPI.
+#
+# In record mode every exchange is appended to a JSONL cassette as it happens.
+# In replay mode the cassette is loaded into a map keyed on method, normalized
+# URL and body hash, and requests are answered from it without a server.
+# Identical requests are answered in the order they were recorded, so a value
+# read before and after a write comes back as it was.
+#
+# The first line of a cassette holds a random seed. Test data generators are
+# seeded from it, so replay sends the same request bodies that were recorded
+# while each new cassette still records fresh data.
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+
+class CassetteMiss(AssertionError):
+    pass
+
+
+# Path plus sorted query string; scheme, host and port are left out so a
+# cassette recorded against one server replays against any base URL
+def normalize_url(url):
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{parts.path}?{query}" if query else parts.path
+
+
+# Hash of the request body, ignoring key order and whitespace in JSON bodies
+def body_hash(body):
+    if not body:
+        return ''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(',', ':')).encode('utf-8')
+    except ValueError:
+        pass
+    return hashlib.sha1(body).hexdigest()
+
+
+def request_key(method, url, body):
+    return method.upper(), normalize_url(url), body_hash(body)
+
+
+class Cassette:
+
+    def __init__(self, path):
+        self.path = path
+        self.misses = []
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._positions = {}
+        self._file = None
+        self.seed = None
+
+    # Index every recorded exchange for replay
+    def load(self):
+        self._entries, self._positions = {}, {}
+        with open(self.path, encoding='utf-8') as cassette:
+            for line in cassette:
+                if line.strip():
+                    entry = json.loads(line)
+                    if 'method' not in entry:
+                        self.seed = entry.get('seed')
+                        continue
+                    key = (entry['method'], entry['url'], entry['body_sha1'])
+                    self._entries.setdefault(key, []).append(entry)
+        return self
+
+    # Open the cassette for appending, starting it with a new seed if it is empty
+    def open_for_record(self):
+        if os.path.exists(self.path) and os.path.getsize(self.path):
+            with open(self.path, encoding='utf-8') as cassette:
+                self.seed = json.loads(cassette.readline()).get('seed')
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if self.seed is None:
+            self.seed = uuid.uuid4().hex
+            self._file.write(json.dumps({'seed': self.seed}) + '\n')
+            self._file.flush()
+        return self
+
+    # Append one exchange, flushing it so an interrupted run keeps what it recorded
+    def append(self, request, response):
+        entry = {
+            'method': request.method,
+            'url': normalize_url(request.url),
+            'body_sha1': body_hash(request.body),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+        }
+        # Keep text bodies readable in the cassette; anything else is base64
+        try:
+            entry['body'] = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['body_base64'] = base64.b64encode(response.content).decode('ascii')
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            if self._file is None:
+                self.open_for_record()
+            self._file.write(line)
+            self._file.flush()
+
+    # Next recorded response for a request; the last one repeats once they run out
+    def lookup(self, method, url, body):
+        key = request_key(method, url, body)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses.append(key)
+                raise CassetteMiss(self._miss_message(key))
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+        return entries[min(position, len(entries) - 1)]
+
+    def _miss_message(self, key):
+        method, url, digest = key
+        same_route = sorted({entry_key[2] or '<empty>' for entry_key in self._entries
+                             if entry_key[:2] == (method, url)})
+        message = (f"No recorded response for {method} {url} "
+                   f"(body sha1 {digest or '<empty>'}) in cassette {self.path}.")
+        if same_route:
+            message += f" Recorded bodies for this route: {', '.join(same_route)}"
+        else:
+            message += " Nothing was recorded for this route; re-record the cassette."
+        return message
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Sends requests for real and appends each exchange to the cassette
+class RecordingAdapter(TunedHTTPAdapter):
+
+    def __init__(self, cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.cassette.append(request, response)
+        return response
+
+
+# Answers requests from the cassette without touching the network
+class ReplayAdapter(BaseAdapter):
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        entry = self.cassette.lookup(request.method, request.url, request.body)
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry['reason']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        if 'body_base64' in entry:
+            response._content = base64.b64decode(entry['body_base64'])
+        else:
+            response._content = entry['body'].encode('utf-8')
+        response._content_consumed = True
+        response.raw = io.BytesIO(response._content)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        # Replayed responses took no time; BaseAPI keeps them out of the latency histograms
+        response.replayed = True
+        return response
+
+    def close(self):
+        pass
+
+
+# Route every session created from now on through a cassette
+def install(mode, path):
+    if mode not in (RECORD, REPLAY):
+        raise ValueError(f"Unknown cassette mode: {mode}")
+    cassette = Cassette(path)
+    if mode == REPLAY:
+        cassette.load()
+        adapter = ReplayAdapter
+    else:
+        cassette.open_for_record()
+        adapter = RecordingAdapter
+    session_registry.close_all()
+    session_registry.adapter_factory = lambda **kwargs: adapter(cassette, **kwargs)
+    return cassette
+
+
+# Go back to the real transport
+def uninstall(cassette):
+    session_registry.close_all()
+    session_registry.adapter_factory = TunedHTTPAdapter
+    cassette.close()
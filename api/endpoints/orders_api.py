@@ -1,18 +1,38 @@
+import uuid
+
+from api.async_base_api import AsyncBaseAPI
 from api.base_api import BaseAPI
 
 class OrdersAPI(BaseAPI):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, base_url=None, retry_policy=None):
+        super().__init__(base_url, retry_policy)
         self.endpoint_base = "/orders"
 
-    # Create a new order
-    def create_order(self, order_data):
-        return self.post(self.endpoint_base, data=order_data)
+    # Create a new order. The Idempotency-Key lets the retry policy resend the request
+    # safely: the server replays the first response instead of placing a second order.
+    def create_order(self, order_data, idempotency_key=None):
+        headers = {'Idempotency-Key': idempotency_key or str(uuid.uuid4())}
+        return self.post(self.endpoint_base, data=order_data, headers=headers)
+    
+    # Create many orders through the bulk endpoint, chunking the rows automatically
+    def create_many(self, orders, chunk_size=500):
+        return self.post_bulk(f"{self.endpoint_base}/bulk", "orders", orders, chunk_size)
     
     # Get an order by ID
     def get_order_by_id(self, order_id):
         return self.get(f"{self.endpoint_base}/{order_id}")
     
+    # Get a page of a user's orders, with or without their items
+    def get_user_orders(self, user_id, after=None, limit=None, include_items=True):
+        params = {}
+        if after is not None:
+            params['after'] = after
+        if limit is not None:
+            params['limit'] = limit
+        if not include_items:
+            params['include_items'] = 'false'
+        return self.get(f"/users/{user_id}/orders", params=params or None)
+    
     # Create a simple order with default values
     def create_simple_order(self, user_id, product_id=1, quantity=1):
         order_data = {
@@ -24,4 +44,57 @@ class OrdersAPI(BaseAPI):
                 }
             ]
         }
-        return self.create_order(order_data)
\ No newline at end of file
+        return self.create_order(order_data)
+
+    # Create orders in parallel over a bounded thread pool, keeping input order.
+    # A spec is either full order data or {"user_id", "product_id", "quantity"}.
+    def create_orders_concurrently(self, specs, max_workers=None):
+        orders = [spec if 'items' in spec else {
+            "user_id": spec["user_id"],
+            "items": [{"product_id": spec.get("product_id", 1), "quantity": spec.get("quantity", 1)}]
+        } for spec in specs]
+        return self._fan_out_requests(self.create_order, orders, 201, max_workers)
+
+
+class AsyncOrdersAPI(AsyncBaseAPI):
+    def __init__(self, base_url=None, pool=None, limit=100):
+        super().__init__(base_url, pool=pool, limit=limit)
+        self.endpoint_base = "/orders"
+
+    # Create a new order with an Idempotency-Key, like OrdersAPI.create_order, so a
+    # resent request is answered with the first response instead of a second order
+    async def create_order(self, order_data, idempotency_key=None):
+        headers = {'Idempotency-Key': idempotency_key or str(uuid.uuid4())}
+        return await self.post(self.endpoint_base, data=order_data, headers=headers)
+
+    # Create many orders through the bulk endpoint, chunking the rows automatically
+    async def create_many(self, orders, chunk_size=500):
+        return await self.post_bulk(f"{self.endpoint_base}/bulk", "orders", orders, chunk_size)
+
+    # Get an order by ID
+    async def get_order_by_id(self, order_id):
+        return await self.get(f"{self.endpoint_base}/{order_id}")
+
+    # Get a page of a user's orders, with or without their items
+    async def get_user_orders(self, user_id, after=None, limit=None, include_items=True):
+        params = {}
+        if after is not None:
+            params['after'] = after
+        if limit is not None:
+            params['limit'] = limit
+        if not include_items:
+            params['include_items'] = 'false'
+        return await self.get(f"/users/{user_id}/orders", params=params or None)
+
+    # Create a simple order with default values
+    async def create_simple_order(self, user_id, product_id=1, quantity=1):
+        order_data = {
+            "user_id": user_id,
+            "items": [
+                {
+                    "product_id": product_id,
+                    "quantity": quantity
+                }
+            ]
+        }
+        return await self.create_order(order_data)
@@ -1,10 +1,17 @@
+from collections import OrderedDict
+
+from api.async_base_api import AsyncBaseAPI
 from api.base_api import BaseAPI
 
 class ProductsAPI(BaseAPI):
 
-    def __init__(self):
-        super().__init__()
+    # Number of products whose ETag and body are kept for revalidation
+    VALIDATOR_CACHE_SIZE = 64
+
+    def __init__(self, base_url=None, retry_policy=None):
+        super().__init__(base_url, retry_policy)
         self.endpoint_base = "/products"
+        self._validator_cache = OrderedDict()
 
     # Get all products
     def get_all_products(self):
@@ -15,12 +22,64 @@ class ProductsAPI(BaseAPI):
         return self.put(f"{self.endpoint_base}/{product_id}/stock", 
                         data={"stock": new_stock})
     
-    # Get specific product, using 
+    # Get a single product, sending If-None-Match when an ETag is given
+    def get_product(self, product_id, etag=None):
+        headers = {'If-None-Match': etag} if etag else None
+        return self.get(f"{self.endpoint_base}/{product_id}", headers=headers)
+
+    # Get specific product, revalidating the cached copy instead of re-downloading it
     def get_product_by_id(self, product_id):
-        response = self.get_all_products()
+        cached = self._validator_cache.get(product_id)
+        response = self.get_product(product_id, etag=cached[0] if cached else None)
+        return self._revalidate(product_id, cached, response)
+
+    # Resolve a conditional product response against the validator cache
+    def _revalidate(self, product_id, cached, response):
+        if response.status_code == 304 and cached:
+            self._validator_cache.move_to_end(product_id)
+            return dict(cached[1])
+
         if response.status_code == 200:
-            products = response.json()['products']
-            for product in products:
-                if product['id'] == product_id:
-                    return product
-        return None
\ No newline at end of file
+            product = response.json()
+            etag = response.headers.get('ETag')
+            if etag:
+                self._validator_cache[product_id] = (etag, product)
+                self._validator_cache.move_to_end(product_id)
+                if len(self._validator_cache) > self.VALIDATOR_CACHE_SIZE:
+                    self._validator_cache.popitem(last=False)
+            return dict(product)
+
+        self._validator_cache.pop(product_id, None)
+        return None
+
+
+class AsyncProductsAPI(AsyncBaseAPI):
+
+    VALIDATOR_CACHE_SIZE = ProductsAPI.VALIDATOR_CACHE_SIZE
+
+    def __init__(self, base_url=None, pool=None, limit=100):
+        super().__init__(base_url, pool=pool, limit=limit)
+        self.endpoint_base = "/products"
+        self._validator_cache = OrderedDict()
+
+    # Get all products
+    async def get_all_products(self):
+        return await self.get(self.endpoint_base)
+
+    # Update product stock
+    async def update_product_stock(self, product_id, new_stock):
+        return await self.put(f"{self.endpoint_base}/{product_id}/stock",
+                              data={"stock": new_stock})
+
+    # Get a single product, sending If-None-Match when an ETag is given
+    async def get_product(self, product_id, etag=None):
+        headers = {'If-None-Match': etag} if etag else None
+        return await self.get(f"{self.endpoint_base}/{product_id}", headers=headers)
+
+    # Get specific product, revalidating the cached copy instead of re-downloading it
+    async def get_product_by_id(self, product_id):
+        cached = self._validator_cache.get(product_id)
+        response = await self.get_product(product_id, etag=cached[0] if cached else None)
+        return self._revalidate(product_id, cached, response)
+
+    _revalidate = ProductsAPI._revalidate
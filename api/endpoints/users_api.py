@@ -1,15 +1,47 @@
+import json
+
+from api.async_base_api import AsyncBaseAPI
 from api.base_api import BaseAPI
 from utils.helpers import TestHelpers
 
 class UsersAPI(BaseAPI):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, base_url=None, retry_policy=None):
+        super().__init__(base_url, retry_policy)
         self.endpoint_base = "/users"
 
-    # Get all users
-    def get_all_users(self):
-        return self.get(self.endpoint_base)
+    # Get a page of users, optionally starting after a given user ID
+    def get_all_users(self, after_id=None, limit=None):
+        params = {}
+        if after_id is not None:
+            params['after_id'] = after_id
+        if limit is not None:
+            params['limit'] = limit
+        return self.get(self.endpoint_base, params=params or None)
+
+    # Iterate over every user, lazily requesting the next page as the cursor advances
+    def iter_users(self, page_size=500, after_id=None):
+        while True:
+            response = self.get_all_users(after_id=after_id, limit=page_size)
+            self.validate_status_code(response, 200)
+            page = response.json()
+            yield from page['users']
+            after_id = page['next_after_id']
+            if after_id is None:
+                return
+
+    # Stream every user as NDJSON, decoding one line at a time
+    def stream_users(self, after_id=None, limit=None):
+        params = {'format': 'ndjson'}
+        if after_id is not None:
+            params['after_id'] = after_id
+        if limit is not None:
+            params['limit'] = limit
+        with self.get(self.endpoint_base, params=params, stream=True) as response:
+            self.validate_status_code(response, 200)
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
     
     # Get user by ID
     def get_user_by_id(self, user_id):
@@ -19,6 +51,10 @@ class UsersAPI(BaseAPI):
     def create_user(self, user_data):
         return self.post(self.endpoint_base, data=user_data)
     
+    # Create many users through the bulk endpoint, chunking the rows automatically
+    def create_many(self, users, chunk_size=500):
+        return self.post_bulk(f"{self.endpoint_base}/bulk", "users", users, chunk_size)
+    
     def create_valid_user(self, username=None, email=None):
         user_data = TestHelpers.generate_test_user()
 
@@ -28,4 +64,62 @@ class UsersAPI(BaseAPI):
             user_data['email'] = email
 
         return self.create_user(user_data), user_data
-    
\ No newline at end of file
+
+    # Create n users in parallel over a bounded thread pool, keeping input order.
+    # The test data is generated up front so it does not depend on thread timing.
+    def create_users_concurrently(self, n, max_workers=None):
+        users = [TestHelpers.generate_test_user() for _ in range(n)]
+        summary = self._fan_out_requests(self.create_user, users, 201, max_workers)
+        for result, user_data in zip(summary['results'], users):
+            result['user_data'] = user_data
+        return summary
+
+
+class AsyncUsersAPI(AsyncBaseAPI):
+
+    def __init__(self, base_url=None, pool=None, limit=100):
+        super().__init__(base_url, pool=pool, limit=limit)
+        self.endpoint_base = "/users"
+
+    # Get a page of users, optionally starting after a given user ID
+    async def get_all_users(self, after_id=None, limit=None):
+        params = {}
+        if after_id is not None:
+            params['after_id'] = after_id
+        if limit is not None:
+            params['limit'] = limit
+        return await self.get(self.endpoint_base, params=params or None)
+
+    # Iterate over every user, lazily requesting the next page as the cursor advances
+    async def iter_users(self, page_size=500, after_id=None):
+        while True:
+            response = await self.get_all_users(after_id=after_id, limit=page_size)
+            self.validate_status_code(response, 200)
+            page = response.json()
+            for user in page['users']:
+                yield user
+            after_id = page['next_after_id']
+            if after_id is None:
+                return
+
+    # Get user by ID
+    async def get_user_by_id(self, user_id):
+        return await self.get(f"{self.endpoint_base}/{user_id}")
+
+    # Create a new user
+    async def create_user(self, user_data):
+        return await self.post(self.endpoint_base, data=user_data)
+
+    # Create many users through the bulk endpoint, chunking the rows automatically
+    async def create_many(self, users, chunk_size=500):
+        return await self.post_bulk(f"{self.endpoint_base}/bulk", "users", users, chunk_size)
+
+    async def create_valid_user(self, username=None, email=None):
+        user_data = TestHelpers.generate_test_user()
+
+        if username:
+            user_data['username'] = username
+        if email:
+            user_data['email'] = email
+
+        return await self.create_user(user_data), user_data
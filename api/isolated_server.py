@@ -0,0 +1,99 @@
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+import requests
+
+# A private mock server with its own database, for one test process.
+#
+# The database is cloned from a template with the sqlite3 backup API (so a
+# template in WAL mode is copied consistently) into a scratch directory, and
+# `python -m api.mock_server serve` is started on a port picked by the OS. Under
+# pytest-xdist every worker runs one, so workers never see each other's writes.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SERVING = re.compile(r'Serving on (http://\S+)')
+
+
+class IsolatedServer:
+
+    def __init__(self, template_db=None, threads=8, startup_timeout=30):
+        self.template_db = template_db
+        self.threads = threads
+        self.startup_timeout = startup_timeout
+        self.directory = None
+        self.db_path = None
+        self.base_url = None
+        self.log_path = None
+        self._process = None
+
+    # Clone the template database and start the server; returns self once it answers
+    def start(self):
+        self.directory = tempfile.mkdtemp(prefix='mock-server-')
+        self.db_path = os.path.join(self.directory, 'ecommerce_test.db')
+        if self.template_db and os.path.exists(self.template_db):
+            with closing(sqlite3.connect(self.template_db)) as source, \
+                 closing(sqlite3.connect(self.db_path)) as target:
+                source.backup(target)
+
+        self.log_path = os.path.join(self.directory, 'server.log')
+        with open(self.log_path, 'w') as log:
+            self._process = subprocess.Popen(
+                [sys.executable, '-m', 'api.mock_server', 'serve', '--workers', '1',
+                 '--threads', str(self.threads), '--port', '0', '--db', self.db_path],
+                cwd=ROOT, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            self.base_url = f"{self._wait_for_address()}/api"
+            self._wait_until_ready()
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    # The server binds port 0 and logs the address it got
+    def _wait_for_address(self):
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            with open(self.log_path) as log:
+                match = _SERVING.search(log.read())
+            if match:
+                return match.group(1)
+            if self._process.poll() is not None:
+                break
+            time.sleep(0.05)
+        raise RuntimeError(f"Mock server did not start:\n{self._log()}")
+
+    def _wait_until_ready(self):
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            try:
+                if requests.get(f"{self.base_url}/products", timeout=1).ok:
+                    return
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.05)
+        raise RuntimeError(f"Mock server at {self.base_url} did not answer:\n{self._log()}")
+
+    def _log(self):
+        with open(self.log_path) as log:
+            return log.read()
+
+    # Stop the server and delete its database
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+        if self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
@@ -1,62 +1,177 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
+import argparse
+import atexit
+import hashlib
+import io
+import itertools
 import json
+import os
+import queue
 import sqlite3
-from datetime import datetime
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
 import uuid
 
+# Allow `python api/mock_server.py` as well as `python -m api.mock_server`
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import rows
+from utils.config import Config
+from utils.schema import migrate
+
 app = Flask(__name__)
 
-def init_db():
-    conn = sqlite3.connect('ecommerce_test.db')
-    cursor = conn.cursor()
+DB_PATH = Config.DB_PATH
 
-    # Create the users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+# How long a pooled connection waits for another writer's lock, in ms
+BUSY_TIMEOUT_MS = 5000
 
-    # Create the products table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS products (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            price REAL NOT NULL,
-            stock INTEGER DEFAULT 0,
-            description TEXT
-        )
-    ''')
+# Pragmas applied to every pooled connection
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA cache_size = -8000',
+    'PRAGMA temp_store = MEMORY',
+)
 
-    # Create the orders table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS orders (
-            id TEXT PRIMARY KEY,
-            user_id INTEGER,
-            total_amount REAL,
-            status TEXT DEFAULT 'pending',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
+# Bounded pool of long-lived SQLite connections shared by all request threads
+class ConnectionPool:
+    def __init__(self, db_path=DB_PATH, size=8, timeout=10):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._connections = []
+        self._lock = threading.Lock()
+        self._closed = False
 
-    # Create the order_items table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS order_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            order_id TEXT,
-            product_id INTEGER,
-            quantity INTEGER,
-            price REAL,
-            FOREIGN KEY (order_id) REFERENCES orders (id),
-            FOREIGN KEY (product_id) REFERENCES products (id)
-        )
-    ''')
+    # Open a new connection and apply the tuning pragmas
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    # Take an idle connection, opening a new one while the pool is below its size
+    def acquire(self):
+        if self._closed:
+            raise RuntimeError('Connection pool is closed')
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._connections) < self.size:
+                conn = self._connect()
+                self._connections.append(conn)
+                return conn
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError('Timed out waiting for a database connection')
+
+    # Return a connection to the pool, discarding any unfinished transaction
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+            return
+        self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    # Close every connection owned by the pool
+    def close(self):
+        with self._lock:
+            self._closed = True
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+        while not self._idle.empty():
+            self._idle.get_nowait()
+
+pool = ConnectionPool()
+
+# Point the server at another database file, replacing the connection pool
+def configure_database(db_path, pool_size=8):
+    global DB_PATH, pool
+    previous = pool
+    DB_PATH = db_path
+    pool = ConnectionPool(db_path, size=pool_size)
+    previous.close()
+
+def close_pool():
+    pool.close()
+
+atexit.register(close_pool)
+
+# Get the pooled connection bound to the current request
+def get_db():
+    if 'db' not in g:
+        g.db = pool.acquire()
+    return g.db
+
+@app.teardown_appcontext
+def release_db(exception=None):
+    conn = g.pop('db', None)
+    if conn is not None:
+        pool.release(conn)
+
+# Server-side counters exposed through GET /api/stats
+stats = Counter()
+_stats_lock = threading.Lock()
+
+def record_stat(name, amount=1):
+    with _stats_lock:
+        stats[name] += amount
+
+MAX_CONTENTION_RETRIES = 10
+# Each BEGIN IMMEDIATE attempt waits this long (ms) for the lock before backing off.
+# With the pool's full busy_timeout SQLite would do all the waiting itself and
+# the retries below would never run.
+BEGIN_BUSY_TIMEOUT_MS = 50
+
+# Start a write transaction, retrying with backoff while another writer holds the lock.
+# Returns the number of retries it took.
+def begin_immediate(conn):
+    conn.execute(f'PRAGMA busy_timeout = {BEGIN_BUSY_TIMEOUT_MS}')
+    try:
+        for attempt in range(MAX_CONTENTION_RETRIES + 1):
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                return attempt
+            except sqlite3.OperationalError as e:
+                busy = 'locked' in str(e) or 'busy' in str(e)
+                if not busy or attempt == MAX_CONTENTION_RETRIES:
+                    raise
+                record_stat('contention_retries')
+                time.sleep(min(0.01 * 2 ** attempt, 0.5))
+    finally:
+        conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+
+def init_db():
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute('PRAGMA journal_mode = WAL')
+    cursor = conn.cursor()
+
+    # Create or upgrade the schema
+    migrate(conn)
 
     # Insert sample products
     cursor.execute('''
@@ -72,26 +187,238 @@ def init_db():
     conn.commit()
     conn.close()
 
+# Build the JSON representation of a users row
+def user_to_dict(user):
+    return rows.to_dict(rows.User, user)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+# Yield users as NDJSON lines, reading the table in fixed-size batches
+def stream_users(after_id, limit):
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        query = 'SELECT * FROM users WHERE id > ? ORDER BY id'
+        params = (after_id,)
+        if limit is not None:
+            query += ' LIMIT ?'
+            params += (limit,)
+        cursor.execute(query, params)
+        while True:
+            batch = cursor.fetchmany(STREAM_BATCH_SIZE)
+            if not batch:
+                break
+            yield ''.join(json.dumps(user_to_dict(row)) + '\n' for row in batch)
+
+# Build the JSON representation of a products row
+def product_to_dict(product):
+    return rows.to_dict(rows.Product, product)
+
+# Process-level cache of the serialized GET /api/products body, kept under the
+# catalog_version token that triggers replace on every products write. Each read
+# checks the token, so writes by other workers, DatabaseUtils or a snapshot
+# restore are seen as soon as they commit.
+class CatalogCache:
+    def __init__(self):
+        self._body = None
+        self._token = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._body = self._token = None
+
+    def get(self, token):
+        with self._lock:
+            if self._token == token:
+                return self._body
+        return None
+
+    def store(self, token, body):
+        with self._lock:
+            self._body, self._token = body, token
+
+# Current catalog_version token of the database
+def catalog_token(conn):
+    return conn.execute('SELECT token FROM catalog_version').fetchone()[0]
+
+catalog_cache = CatalogCache()
+app.config['CATALOG_CACHE'] = os.getenv('MOCK_CATALOG_CACHE', '1') != '0'
+
+BULK_CHUNK_SIZE = 500
+
+# Read the rows of a bulk request: a JSON array, an object wrapping one, or an NDJSON stream.
+# Malformed NDJSON lines are yielded as None so they can be reported per row.
+def iter_bulk_rows(key):
+    if request.mimetype == 'application/x-ndjson':
+        for line in io.BufferedReader(request.stream, buffer_size=65536):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+        return
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get(key)
+    yield from data
+
+# Validate the body of a bulk request that is not streamed
+def bulk_payload_error(key):
+    if request.mimetype == 'application/x-ndjson':
+        return None
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get(key)
+    if not isinstance(data, list):
+        return jsonify({'error': f'Expected a JSON array of {key} or an NDJSON stream'}), 400
+    return None
+
+# Row field checks, so a malformed bulk row gets its own 400 instead of failing its chunk
+def is_text(value):
+    return isinstance(value, str) and value != ''
+
+def is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+# Split an iterable into lists of at most `size` elements
+def chunked(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+# Insert a chunk of users with one conflict lookup and one executemany.
+# Returns one (status, body) pair per row.
+def insert_users(cursor, users):
+    required_fields = ['username', 'email', 'first_name', 'last_name']
+    results = [None] * len(users)
+    valid = []
+    for index, user in enumerate(users):
+        if not isinstance(user, dict):
+            results[index] = (400, {'error': 'User must be a JSON object'})
+            continue
+        missing = next((field for field in required_fields if field not in user), None)
+        if missing:
+            results[index] = (400, {'error': f'{missing} is required'})
+            continue
+        invalid = next((field for field in required_fields if not is_text(user[field])), None)
+        if invalid:
+            results[index] = (400, {'error': f'{invalid} must be a non-empty string'})
+            continue
+        valid.append(index)
+
+    # Existing usernames and emails that would violate the unique constraints
+    cursor.execute('''
+        SELECT username, email FROM users
+        WHERE username IN (SELECT value FROM json_each(?))
+           OR email IN (SELECT value FROM json_each(?))
+    ''', (json.dumps([users[i]['username'] for i in valid]),
+          json.dumps([users[i]['email'] for i in valid])))
+    taken_usernames, taken_emails = set(), set()
+    for username, email in cursor.fetchall():
+        taken_usernames.add(username)
+        taken_emails.add(email)
+
+    batch = []
+    for index in valid:
+        user = users[index]
+        if user['email'] in taken_emails:
+            results[index] = (409, {'error': f'User with email {user["email"]} already exists'})
+        elif user['username'] in taken_usernames:
+            results[index] = (409, {'error': f'User with username {user["username"]} already exists'})
+        else:
+            taken_usernames.add(user['username'])
+            taken_emails.add(user['email'])
+            batch.append(index)
+
+    cursor.executemany('''
+        INSERT INTO users (username, email, first_name, last_name)
+        VALUES (?, ?, ?, ?)
+    ''', [(users[i]['username'], users[i]['email'], users[i]['first_name'], users[i]['last_name'])
+          for i in batch])
+
+    cursor.execute('''
+        SELECT username, id FROM users WHERE username IN (SELECT value FROM json_each(?))
+    ''', (json.dumps([users[i]['username'] for i in batch]),))
+    ids = dict(cursor.fetchall())
+    for index in batch:
+        results[index] = (201, {'id': ids[users[index]['username']],
+                                'username': users[index]['username']})
+    return results
+
+# Run a bulk insert chunk by chunk, one write transaction per chunk, and collect per-row results
+def run_bulk(key, insert_chunk):
+    error = bulk_payload_error(key)
+    if error:
+        return error
+
+    conn = get_db()
+    cursor = conn.cursor()
+    results = []
+    created = 0
+
+    try:
+        for chunk in chunked(iter_bulk_rows(key), BULK_CHUNK_SIZE):
+            begin_immediate(conn)
+            chunk_results = insert_chunk(cursor, chunk)
+            conn.commit()
+
+            for status, body in chunk_results:
+                results.append({'index': len(results), 'status_code': status, **body})
+                created += status == 201
+    except Exception as e:
+        # A database failure: earlier chunks stay committed and are reported, so
+        # the client resubmits only the rows from index len(results) on
+        conn.rollback()
+        return jsonify({
+            'error': str(e),
+            'results': results,
+            'created': created,
+            'failed': len(results) - created,
+            'committed': len(results)
+        }), 500
+
+    return jsonify({
+        'results': results,
+        'created': created,
+        'failed': len(results) - created
+    })
+
 # API Routes
 @app.route('/api/users', methods=['GET'])
 def get_users():
-    conn = sqlite3.connect('ecommerce_test.db')
+    after_id = request.args.get('after_id', 0, type=int)
+    limit = request.args.get('limit', type=int)
+
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+
+    # NDJSON streaming mode, unbounded unless a limit is given
+    if request.args.get('format') == 'ndjson':
+        return Response(stream_users(after_id, limit), mimetype='application/x-ndjson')
+
+    limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    # Keyset pagination: fetch one extra row to know whether another page exists
+    conn = get_db()
     cursor = conn.cursor()
-    cursor.execute('SELECT * FROM users')
+    cursor.execute('SELECT * FROM users WHERE id > ? ORDER BY id LIMIT ?',
+                   (after_id, limit + 1))
     users = cursor.fetchall()
-    conn.close()
-    
+
+    has_more = len(users) > limit
+    users = users[:limit]
+
     return jsonify({
-        'users': [
-            {
-                'id': user[0],
-                'username': user[1], 
-                'email': user[2],
-                'first_name': user[3],
-                'last_name': user[4],
-                'created_at': user[5]
-            } for user in users
-        ]
+        'users': [user_to_dict(user) for user in users],
+        'next_after_id': users[-1][0] if has_more else None
     })
 
 @app.route('/api/users', methods=['POST'])
@@ -104,7 +431,7 @@ def create_user():
             return jsonify({'error': f'{field} is required'}), 400
     
     try:
-        conn = sqlite3.connect('ecommerce_test.db')
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO users (username, email, first_name, last_name)
@@ -113,7 +440,6 @@ def create_user():
         
         user_id = cursor.lastrowid
         conn.commit()
-        conn.close()
 
         return jsonify({
             'id': user_id,
@@ -127,45 +453,157 @@ def create_user():
     except sqlite3.IntegrityError as e:
         return jsonify({'error': f'User with email {data["email"]} already exists'}), 409
 
+@app.route('/api/users/bulk', methods=['POST'])
+def create_users_bulk():
+    return run_bulk('users', insert_users)
+
 @app.route('/api/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
-    conn = sqlite3.connect('ecommerce_test.db')
+    conn = get_db()
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
     user = cursor.fetchone()
-    conn.close()
 
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
+    return jsonify(user_to_dict(user))
+
+@app.route('/api/users/<int:user_id>/orders', methods=['GET'])
+def get_user_orders(user_id):
+    after = request.args.get('after', 0, type=int)
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    include_items = request.args.get('include_items', 'true').lower() not in ('false', '0', 'no')
+
+    if limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    conn = get_db()
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT 1 FROM users WHERE id = ?', (user_id,))
+    if not cursor.fetchone():
+        return jsonify({'error': 'User not found'}), 404
+
+    # Keyset page of the user's orders in insertion (rowid) order, one extra to detect more
+    page_query = '''
+        SELECT rowid AS cursor, id, total_amount, status, created_at
+        FROM orders
+        WHERE user_id = ? AND rowid > ?
+        ORDER BY rowid
+        LIMIT ?
+    '''
+    params = (user_id, after, limit + 1)
+
+    if include_items:
+        # Orders and their items from one joined query, ordered so each order's rows are adjacent
+        cursor.execute(f'''
+            WITH page AS ({page_query})
+            SELECT page.cursor, page.id, page.total_amount, page.status, page.created_at,
+                   oi.product_id, p.name, oi.quantity, oi.price
+            FROM page
+            LEFT JOIN order_items oi ON oi.order_id = page.id
+            LEFT JOIN products p ON p.id = oi.product_id
+            ORDER BY page.cursor, oi.id
+        ''', params)
+    else:
+        cursor.execute(page_query, params)
+
+    # Group the rows into orders in a single pass
+    orders = []
+    cursors = []
+    for row in cursor:
+        if not cursors or cursors[-1] != row[0]:
+            cursors.append(row[0])
+            order = {
+                'order_id': row[1],
+                'total_amount': row[2],
+                'status': row[3],
+                'created_at': row[4]
+            }
+            if include_items:
+                order['items'] = []
+            orders.append(order)
+        if include_items and row[5] is not None:
+            orders[-1]['items'].append({
+                'product_id': row[5],
+                'product_name': row[6],
+                'quantity': row[7],
+                'price': row[8]
+            })
+
+    has_more = len(orders) > limit
+    orders, cursors = orders[:limit], cursors[:limit]
+
     return jsonify({
-        'id': user[0],
-        'username': user[1], 
-        'email': user[2],
-        'first_name': user[3],
-        'last_name': user[4],
-        'created_at': user[5]
+        'user_id': user_id,
+        'orders': orders,
+        'next_cursor': cursors[-1] if has_more else None
     })
 
 @app.route('/api/products', methods=['GET'])
 def get_products():
-    conn = sqlite3.connect('ecommerce_test.db')
+    use_cache = app.config['CATALOG_CACHE']
+    conn = get_db()
+    if use_cache:
+        body = catalog_cache.get(catalog_token(conn))
+        if body is not None:
+            record_stat('catalog_cache_hits')
+            response = app.response_class(body, mimetype='application/json')
+            response.headers['X-Catalog-Cache'] = 'hit'
+            return response
+        record_stat('catalog_cache_misses')
+        # Read the token again with the rows in one read transaction, so the body
+        # is stored under the token of the data it was built from
+        conn.execute('BEGIN')
+        token = catalog_token(conn)
+
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM products')
     products = cursor.fetchall()
-    conn.close()
 
-    return jsonify({
-        'products': [
-            {
-                'id': product[0],
-                'name': product[1],
-                'price': product[2],
-                'stock': product[3],
-                'description': product[4]
-            } for product in products
-        ]
+    response = jsonify({
+        'products': [product_to_dict(product) for product in products]
     })
+    if use_cache:
+        conn.commit()
+        catalog_cache.store(token, response.get_data())
+        response.headers['X-Catalog-Cache'] = 'miss'
+    return response
+
+@app.route('/api/products/<int:product_id>', methods=['GET'])
+def get_product(product_id):
+    conn = get_db()
+    cursor = conn.cursor()
+    # The modification time is read with the row so both describe the same write
+    cursor.execute('''
+        SELECT p.*, m.modified_at
+        FROM products p
+        JOIN product_modified m ON m.product_id = p.id
+        WHERE p.id = ?
+    ''', (product_id,))
+    row = cursor.fetchone()
+
+    if not row:
+        return jsonify({'error': 'Product not found'}), 404
+
+    # Strong validator derived from the product's current content
+    product = product_to_dict(row[:-1])
+    etag = hashlib.sha1(json.dumps(product, sort_keys=True).encode()).hexdigest()
+    last_modified = datetime.fromtimestamp(row[-1], timezone.utc)
+
+    # If-None-Match takes precedence; If-Modified-Since is only used without it
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and last_modified <= since
+
+    response = Response(status=304) if not_modified else jsonify(product)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    return response
 
 @app.route('/api/products/<int:product_id>/stock', methods=['PUT'])
 def update_product_stock(product_id):
@@ -175,19 +613,145 @@ def update_product_stock(product_id):
     if new_stock is None:
         return jsonify({'error': 'Stock is required'}), 400
     
-    conn = sqlite3.connect('ecommerce_test.db')
+    conn = get_db()
     cursor = conn.cursor()
     cursor.execute('UPDATE products SET stock = ? WHERE id = ?', (new_stock, product_id))
 
     if cursor.rowcount == 0:
-        conn.close()
         return jsonify({'error': 'Product not found'}), 404
     
     conn.commit()
-    conn.close()
 
     return jsonify({'message': 'Product stock updated successfully', 'new_stock': new_stock})
 
+# Price and reserve stock for a batch of orders inside the caller's write transaction.
+# Returns one (status, body) pair per order;
+# only orders with status 201 are written.
+def place_orders(cursor, orders):
+    carts = []
+    for order in orders:
+        if not isinstance(order, dict):
+            carts.append((400, {'error': 'Order must be a JSON object'}))
+            continue
+        missing = next((field for field in ('user_id', 'items') if field not in order), None)
+        if missing:
+            carts.append((400, {'error': f'{missing} is required'}))
+            continue
+        if not is_integer(order['user_id']):
+            carts.append((400, {'error': 'user_id must be an integer'}))
+            continue
+        if not isinstance(order['items'], list) or not order['items']:
+            carts.append((400, {'error': 'items must be a non-empty list'}))
+            continue
+        try:
+            items = [(item['product_id'], item['quantity']) for item in order['items']]
+        except (KeyError, TypeError):
+            carts.append((400, {'error': 'Each item needs a product_id and a quantity'}))
+            continue
+        if not all(is_integer(product_id) and is_integer(quantity) for product_id, quantity in items):
+            carts.append((400, {'error': 'product_id and quantity must be integers'}))
+            continue
+        # A zero or negative quantity would pass the stock guard and add stock instead
+        if any(quantity < 1 for _, quantity in items):
+            carts.append((400, {'error': 'quantity must be a positive integer'}))
+            continue
+
+        # Total quantity requested per product, in cart order
+        requested = {}
+        for product_id, quantity in items:
+            requested[product_id] = requested.get(product_id, 0) + quantity
+        carts.append((order, items, requested))
+
+    # Look up every product in the batch with a single query
+    product_ids = {product_id for cart in carts if len(cart) == 3 for product_id in cart[2]}
+    cursor.execute('''
+        SELECT id, price, stock FROM products
+        WHERE id IN (SELECT value FROM json_each(?))
+    ''', (json.dumps(list(product_ids)),))
+    prices, stock = {}, {}
+    for product_id, price, available in cursor.fetchall():
+        prices[product_id] = price
+        stock[product_id] = available
+
+    results = []
+    order_rows, item_rows, decrements = [], [], {}
+    for cart in carts:
+        if len(cart) == 2:
+            results.append(cart)
+            continue
+        order, items, requested = cart
+
+        missing = next((product_id for product_id in requested if product_id not in prices), None)
+        if missing is not None:
+            results.append((404, {'error': f'Product {missing} not found'}))
+            continue
+
+        # Stock is tracked in memory while the write lock is held; a short line fails the order
+        short = next((product_id for product_id, quantity in requested.items()
+                      if stock[product_id] < quantity), None)
+        if short is not None:
+            record_stat('orders_rejected_stock')
+            results.append((400, {'error': f'Not enough stock for product {short}'}))
+            continue
+
+        for product_id, quantity in requested.items():
+            stock[product_id] -= quantity
+            decrements[product_id] = decrements.get(product_id, 0) + quantity
+
+        order_id = str(uuid.uuid4())
+        total_amount = 0
+        for product_id, quantity in items:
+            total_amount += prices[product_id] * quantity
+        order_rows.append((order_id, order['user_id'], total_amount))
+        item_rows.extend((order_id, product_id, quantity, prices[product_id])
+                         for product_id, quantity in items)
+        results.append((201, {
+            'order_id': order_id,
+            'total_amount': total_amount,
+            'status': 'completed',
+            'message': 'Order created successfully'
+        }))
+
+    if not order_rows:
+        return results
+
+    # Reserve stock only where enough is left, in one batch
+    cursor.executemany('''
+        UPDATE products SET stock = stock - ? WHERE id = ? AND stock >= ?
+    ''', [(quantity, product_id, quantity) for product_id, quantity in decrements.items()])
+    if cursor.rowcount != len(decrements):
+        raise sqlite3.IntegrityError('Stock changed while the orders were being reserved')
+
+    # Insert the orders and all their items in batches
+    cursor.executemany('''
+        INSERT INTO orders (id, user_id, total_amount, status)
+        VALUES (?, ?, ?, 'completed')
+    ''', order_rows)
+    cursor.executemany('''
+        INSERT INTO order_items (order_id, product_id, quantity, price)
+        VALUES (?, ?, ?, ?)
+    ''', item_rows)
+    record_stat('orders_created', len(order_rows))
+
+    return results
+
+# Number of Idempotency-Key responses kept; the oldest are pruned as new ones arrive
+IDEMPOTENCY_MAX_KEYS = int(os.getenv('MOCK_IDEMPOTENCY_MAX_KEYS', '10000'))
+
+# Look up the stored response for an Idempotency-Key inside the caller's transaction
+def find_idempotent_response(cursor, key):
+    cursor.execute('SELECT request_hash, status, body FROM idempotency_keys WHERE key = ?', (key,))
+    return cursor.fetchone()
+
+# Store the response for an Idempotency-Key and drop the oldest keys beyond the limit
+def store_idempotent_response(cursor, key, request_hash, status, body):
+    cursor.execute('''
+        INSERT INTO idempotency_keys (key, request_hash, status, body)
+        VALUES (?, ?, ?, ?)
+    ''', (key, request_hash, status, json.dumps(body)))
+    cursor.execute('DELETE FROM idempotency_keys WHERE rowid <= ?',
+                   (cursor.lastrowid - IDEMPOTENCY_MAX_KEYS,))
+
 @app.route('/api/orders', methods=['POST'])
 def create_order():
     data = request.get_json()
@@ -197,73 +761,55 @@ def create_order():
         if field not in data:
             return jsonify({'error': f'{field} is required'}), 400
     
-    order_id = str(uuid.uuid4())
-    total_amount = 0
-    
-    conn = sqlite3.connect('ecommerce_test.db')
+    idempotency_key = request.headers.get('Idempotency-Key')
+    request_hash = hashlib.sha1(request.get_data()).hexdigest() if idempotency_key else None
+
+    conn = get_db()
     cursor = conn.cursor()
     
     try:
-        # Calculate total and validate products
-        for item in data['items']:
-            product_id = item['product_id']
-            quantity = item['quantity']
-            
-            cursor.execute('SELECT price, stock FROM products WHERE id = ?', (product_id,))
-            product = cursor.fetchone()
-            
-            if not product:
-                return jsonify({'error': f'Product {product_id} not found'}), 404
-            
-            price, stock = product
-            if stock < quantity:
-                return jsonify({'error': f'Not enough stock for product {product_id}'}), 400
-            
-            total_amount += price * quantity
-
-        # Insert order into the database
-        cursor.execute('''
-            INSERT INTO orders (id, user_id, total_amount, status)
-            VALUES (?, ?, ?, 'completed')
-        ''', (order_id, data['user_id'], total_amount))
-        
-        # Create order items and update stock
-        for item in data['items']:
-            product_id = item['product_id']
-            quantity = item['quantity']
-            
-            cursor.execute('SELECT price FROM products WHERE id = ?', (product_id,))
-            price = cursor.fetchone()[0]
-            
-            cursor.execute('''
-                INSERT INTO order_items (order_id, product_id, quantity, price)
-                VALUES (?, ?, ?, ?)
-            ''', (order_id, product_id, quantity, price))
-            
-            # Update stock
-            cursor.execute('''
-                UPDATE products SET stock = stock - ? WHERE id = ?
-            ''', (quantity, product_id))
-        
+        # Take the write lock up front so the stock check and decrement are atomic
+        retries = begin_immediate(conn)
+
+        # A retried request gets the original response instead of a second order
+        if idempotency_key:
+            stored = find_idempotent_response(cursor, idempotency_key)
+            if stored:
+                conn.rollback()
+                if stored[0] != request_hash:
+                    return jsonify({'error': 'Idempotency-Key was already used with a different request'}), 422
+                record_stat('idempotent_replays')
+                response = Response(stored[2], status=stored[1], mimetype='application/json')
+                response.headers['Idempotent-Replayed'] = 'true'
+                return response
+
+        [(status, body)] = place_orders(cursor, [data])
+        if status != 201:
+            conn.rollback()
+            return jsonify(body), status
+
+        # Only created orders are stored; a rejected request wrote nothing and can be retried
+        if idempotency_key:
+            store_idempotent_response(cursor, idempotency_key, request_hash, status, body)
         conn.commit()
-        conn.close()
 
-        return jsonify({
-            'order_id': order_id,
-            'total_amount': total_amount,
-            'status': 'completed',
-            'message': 'Order created successfully'
-        }), 201
+        response = jsonify(body)
+        response.headers['X-Contention-Retries'] = str(retries)
+        return response, 201
     
     except Exception as e:
         conn.rollback()
-        conn.close()
         return jsonify({'error': str(e)}), 500
     
+@app.route('/api/orders/bulk', methods=['POST'])
+def create_orders_bulk():
+    return run_bulk('orders', place_orders)
+
 @app.route('/api/orders/<order_id>', methods=['GET'])
 def get_order(order_id):
-    conn = sqlite3.connect('ecommerce_test.db')
+    conn = get_db()
     cursor = conn.cursor()
+    cursor.row_factory = rows.row_factory(rows.OrderDetails)
 
     cursor.execute('''
         SELECT o.*, u.username
@@ -275,10 +821,10 @@ def get_order(order_id):
     order = cursor.fetchone()
 
     if not order:
-        conn.close()
         return jsonify({'error': 'Order not found'}), 404
     
     # Get order items
+    cursor.row_factory = rows.row_factory(rows.OrderItemDetails)
     cursor.execute('''
         SELECT oi.*, p.name 
         FROM order_items oi 
@@ -287,25 +833,69 @@ def get_order(order_id):
     ''', (order_id,))
     
     items = cursor.fetchall()
-    conn.close()
     
     return jsonify({
-        'order_id': order[0],
-        'user_id': order[1],
-        'username': order[5],
-        'total_amount': order[2],
-        'status': order[3],
-        'created_at': order[4],
+        'order_id': order.id,
+        'user_id': order.user_id,
+        'username': order.username,
+        'total_amount': order.total_amount,
+        'status': order.status,
+        'created_at': order.created_at,
         'items': [
             {
-                'product_id': item[2],
-                'product_name': item[5],
-                'quantity': item[3],
-                'price': item[4]
+                'product_id': item.product_id,
+                'product_name': item.product_name,
+                'quantity': item.quantity,
+                'price': item.price
             } for item in items
         ]
     })
 
-if __name__ == '__main__':
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    # Counters are kept per process; under `serve --workers N` they cover one worker
+    with _stats_lock:
+        return jsonify({'stats': dict(stats), 'pid': os.getpid()})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mock e-commerce API server')
+    commands = parser.add_subparsers(dest='command')
+
+    serve_parser = commands.add_parser('serve', help='run the multi-worker production server')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=5000)
+    serve_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    serve_parser.add_argument('--threads', type=int, default=8)
+    serve_parser.add_argument('--db', default=DB_PATH)
+    serve_parser.add_argument('--access-log', action='store_true')
+
+    migrate_parser = commands.add_parser('migrate', help='create or upgrade the database schema')
+    migrate_parser.add_argument('--db', default=DB_PATH)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        with closing(sqlite3.connect(args.db)) as conn:
+            applied = migrate(conn)
+        print(f"Applied migrations: {applied}" if applied else "Schema is up to date")
+        return
+
+    # Without a command, keep the Werkzeug development server with the reloader and debugger
+    if args.command != 'serve':
+        init_db()
+        app.run(debug=True, port=5000)
+        return
+
+    from api.wsgi_server import serve
+
+    configure_database(args.db, pool_size=args.threads)
     init_db()
-    app.run(debug=True, port=5000)
\ No newline at end of file
+
+    # Each forked worker opens its own connections
+    serve(app, host=args.host, port=args.port, workers=args.workers, threads=args.threads,
+          access_log=args.access_log,
+          on_worker_start=lambda: configure_database(args.db, pool_size=args.threads),
+          on_worker_exit=close_pool)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
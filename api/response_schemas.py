@@ -0,0 +1,203 @@
+import functools
+import json
+
+# Response shapes declared once and compiled into validator callables.
+#
+# A shape is a Python type (or tuple of types), Optional(shape), a one-element
+# list [shape] for a JSON array whose items all match shape, or a dict of
+# field -> shape for a JSON object. Fields that are not declared are allowed.
+# Schema(shape) compiles the shape once; calling the schema walks a parsed body
+# and raises AssertionError naming the path of the first mismatch.
+
+# JSON numbers; bool is excluded explicitly because it is a subclass of int
+Number = (int, float)
+
+
+class Optional:
+
+    def __init__(self, shape):
+        self.shape = shape
+
+
+def _type_name(expected):
+    if isinstance(expected, tuple):
+        return ' or '.join(t.__name__ for t in expected)
+    return expected.__name__
+
+
+def _describe(path):
+    return path or 'response'
+
+
+def _compile(shape):
+    if isinstance(shape, Optional):
+        inner = _compile(shape.shape)
+
+        def check_optional(value, path):
+            if value is not None:
+                inner(value, path)
+        return check_optional
+
+    if isinstance(shape, dict):
+        fields = tuple((name, _compile(field_shape)) for name, field_shape in shape.items())
+
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                raise AssertionError(f"JSON schema is not correct. {_describe(path)}: "
+                                     f"expected object, got {type(value).__name__}")
+            prefix = f"{path}." if path else ''
+            for name, check in fields:
+                if name not in value:
+                    raise AssertionError(f"JSON schema is not correct. Missing field: {prefix}{name}")
+                check(value[name], prefix + name)
+        return check_object
+
+    if isinstance(shape, list):
+        if len(shape) != 1:
+            raise ValueError("A list shape must hold exactly one item shape")
+        item = _compile(shape[0])
+
+        def check_array(value, path):
+            if not isinstance(value, list):
+                raise AssertionError(f"JSON schema is not correct. {_describe(path)}: "
+                                     f"expected array, got {type(value).__name__}")
+            for index, element in enumerate(value):
+                item(element, f"{path}[{index}]")
+        return check_array
+
+    if isinstance(shape, type) or isinstance(shape, tuple):
+        expected = shape
+        allow_bool = expected is bool or (isinstance(expected, tuple) and bool in expected)
+        name = _type_name(expected)
+
+        def check_type(value, path):
+            if not isinstance(value, expected) or (isinstance(value, bool) and not allow_bool):
+                raise AssertionError(f"JSON schema is not correct. {_describe(path)}: "
+                                     f"expected {name}, got {type(value).__name__}")
+        return check_type
+
+    raise ValueError(f"Unsupported schema shape: {shape!r}")
+
+
+class Schema:
+
+    def __init__(self, shape):
+        self.shape = shape
+        self._check = _compile(shape)
+
+    def __call__(self, data):
+        self._check(data, '')
+        return data
+
+
+# The old validate_json_schema form: a list of top-level fields that must be present
+@functools.lru_cache(maxsize=None)
+def fields_schema(fields):
+    return Schema({field: object for field in fields})
+
+
+# Make response.json() decode the body once and hand back the same object afterwards.
+# Calls with decoder arguments are passed through uncached.
+def memoize_json(response):
+    if getattr(response, '_json_memoized', False):
+        return response
+    decode = response.json
+    cache = []
+
+    def json_once(**kwargs):
+        if kwargs:
+            return decode(**kwargs)
+        if not cache:
+            cache.append(decode())
+        return cache[0]
+
+    response.json = json_once
+    response._json_memoized = True
+    return response
+
+
+# Validate a response body against a Schema or a list of required fields and return it
+def validate(response, schema):
+    if not isinstance(schema, Schema):
+        schema = fields_schema(tuple(schema))
+    try:
+        data = response.json()
+    except json.JSONDecodeError:
+        raise AssertionError(f"JSON schema is not correct. Response: {response.text}")
+    return schema(data)
+
+
+USER = Schema({
+    'id': int,
+    'username': str,
+    'email': str,
+    'first_name': str,
+    'last_name': str,
+    'created_at': Optional(str),
+})
+
+USER_CREATED = Schema({
+    'id': int,
+    'username': str,
+    'email': str,
+    'first_name': str,
+    'last_name': str,
+    'message': str,
+})
+
+USERS_PAGE = Schema({
+    'users': [USER.shape],
+    'next_after_id': Optional(int),
+})
+
+PRODUCT = Schema({
+    'id': int,
+    'name': str,
+    'price': Number,
+    'stock': int,
+    'description': Optional(str),
+})
+
+PRODUCTS = Schema({
+    'products': [PRODUCT.shape],
+})
+
+STOCK_UPDATED = Schema({
+    'message': str,
+    'new_stock': int,
+})
+
+ORDER_CREATED = Schema({
+    'order_id': str,
+    'total_amount': Number,
+    'status': str,
+    'message': str,
+})
+
+ORDER_ITEM = Schema({
+    'product_id': int,
+    'product_name': str,
+    'quantity': int,
+    'price': Number,
+})
+
+ORDER = Schema({
+    'order_id': str,
+    'user_id': int,
+    'username': str,
+    'total_amount': Number,
+    'status': str,
+    'created_at': Optional(str),
+    'items': [ORDER_ITEM.shape],
+})
+
+USER_ORDERS = Schema({
+    'user_id': int,
+    'orders': [{
+        'order_id': str,
+        'total_amount': Number,
+        'status': str,
+        'created_at': Optional(str),
+    }],
+    'next_cursor': Optional(int),
+})
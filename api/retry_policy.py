@@ -0,0 +1,61 @@
+import random
+import threading
+from collections import Counter
+
+# Client-side retry counters shared by every BaseAPI in the process
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def record_retry_stat(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+# Snapshot of the retry counters: retries, retries_exhausted, deduped_responses
+def retry_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_retry_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+# When and how often BaseAPI retries a request.
+# Each method has its own retry budget. Methods without one (POST by default) are
+# only retried when the request carries an Idempotency-Key, because the server can
+# then replay the first response instead of repeating the side effect.
+class RetryPolicy:
+
+    # Responses that point to a transient server problem
+    RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+    # Retries per method for requests that are safe to repeat
+    METHOD_RETRIES = {'GET': 3, 'HEAD': 3, 'OPTIONS': 3, 'PUT': 3, 'DELETE': 3}
+
+    def __init__(self, max_retries=3, backoff_factor=0.05, max_backoff=2.0,
+                 statuses=None, method_retries=None):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses) if statuses is not None else self.RETRY_STATUSES
+        self.method_retries = dict(self.METHOD_RETRIES if method_retries is None else method_retries)
+
+    # Number of retries allowed for a request
+    def retries_for(self, method, headers=None):
+        if headers and 'Idempotency-Key' in headers:
+            return self.max_retries
+        return min(self.method_retries.get(method.upper(), 0), self.max_retries)
+
+    def should_retry_status(self, status_code):
+        return status_code in self.statuses
+
+    # Exponential backoff with full jitter, so concurrent clients do not retry in lockstep
+    def backoff(self, retry_number):
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** retry_number))
+
+
+# Policy that never retries
+NO_RETRY = RetryPolicy(max_retries=0)
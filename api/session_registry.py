@@ -0,0 +1,133 @@
+import os
+import socket
+import threading
+from collections import Counter
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Process-wide requests.Session registry. Every client built for the same base
+# URL borrows one session, so its connection pool is reused across clients and
+# tests instead of being rebuilt by each setup fixture.
+
+# Number of hosts each session keeps a connection pool for
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+# Connections kept per host; should cover the number of threads sharing a session
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+KEEP_ALIVE = os.getenv("HTTP_KEEP_ALIVE", "1") != "0"
+TCP_NODELAY = os.getenv("HTTP_TCP_NODELAY", "1") != "0"
+
+_sessions = {}
+_lock = threading.Lock()
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+# Connections that count every socket they open, including reconnects after the
+# server closed a pooled connection
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        super().connect()
+        _count("connections_opened")
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        super().connect()
+        _count("connections_opened")
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+    def _make_request(self, *args, **kwargs):
+        _count("requests")
+        return super()._make_request(*args, **kwargs)
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+    def _make_request(self, *args, **kwargs):
+        _count("requests")
+        return super()._make_request(*args, **kwargs)
+
+
+# Adapter with configurable socket options and counting connection pools
+class TunedHTTPAdapter(HTTPAdapter):
+
+    # Keep the tuning when the adapter is pickled and its pool manager rebuilt
+    __attrs__ = HTTPAdapter.__attrs__ + ["socket_options"]
+
+    def __init__(self, tcp_nodelay=True, keep_alive=True, **kwargs):
+        self.socket_options = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(tcp_nodelay))]
+        if keep_alive:
+            self.socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+# Builds the transport adapter for new sessions; api.cassette swaps it to record or replay
+adapter_factory = TunedHTTPAdapter
+
+
+# Get the shared session for a base URL, creating it on first use
+def get_session(base_url, pool_connections=None, pool_maxsize=None,
+                keep_alive=None, tcp_nodelay=None):
+    with _lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            keep_alive = KEEP_ALIVE if keep_alive is None else keep_alive
+            adapter = adapter_factory(
+                tcp_nodelay=TCP_NODELAY if tcp_nodelay is None else tcp_nodelay,
+                keep_alive=keep_alive,
+                pool_connections=pool_connections or POOL_CONNECTIONS,
+                pool_maxsize=pool_maxsize or POOL_MAXSIZE,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if not keep_alive:
+                session.headers["Connection"] = "close"
+            _sessions[base_url] = session
+        return session
+
+
+# Connections opened vs reused across every registered session
+def connection_stats():
+    with _stats_lock:
+        opened = _stats["connections_opened"]
+        requests_sent = _stats["requests"]
+    return {
+        "requests": requests_sent,
+        "connections_opened": opened,
+        "connections_reused": max(requests_sent - opened, 0),
+    }
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+# Close and forget every registered session
+def close_all():
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
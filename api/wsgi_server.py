@@ -0,0 +1,373 @@
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import InternalServerError
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+from werkzeug.wsgi import LimitedStream
+
+# Preforking, thread-pooled WSGI server built on the stdlib and Werkzeug.
+#
+# The parent process binds the listening socket once and forks `workers`
+# children that accept from it. Each child serves requests on a bounded pool of
+# `threads` threads, over persistent HTTP/1.1 connections. SIGTERM or SIGINT
+# stops accepting, lets in-flight requests finish and then exits; the parent
+# replaces workers that die unexpectedly. Platforms without os.fork run a single
+# worker.
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    # Werkzeug's handler closes the connection after every response. This one
+    # keeps it open: the rest of each request body is drained so the next request
+    # line is read from the right place, and the connection is only closed when
+    # the client asks, when the stream can no longer be trusted, or when the
+    # server wants the thread back.
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    # Drop clients that stall mid-request so they do not pin pool threads
+    timeout = 5
+    # How long a kept-alive connection may hold a thread waiting for its next request
+    keep_alive_timeout = 2
+    access_log = False
+    requests_served = 0
+
+    def log_request(self, code="-", size="-"):
+        if self.access_log:
+            super().log_request(code, size)
+
+    def handle_one_request(self):
+        if self.requests_served:
+            self.raw_requestline = self._wait_for_request()
+        else:
+            self.raw_requestline = self.rfile.readline(65537)
+        if not self.raw_requestline:
+            self.close_connection = True
+            return
+        if len(self.raw_requestline) > 65536:
+            self.requestline = self.request_version = self.command = ''
+            self.send_error(414)
+            return
+        if self.parse_request():
+            self.run_wsgi()
+            self.requests_served += 1
+
+    # Read the next request line of a kept-alive connection. While it waits the
+    # connection is idle, and a server that is stopping shuts it down.
+    def _wait_for_request(self):
+        if not self.server.connection_idle(self.connection):
+            return b''
+        self.connection.settimeout(self.keep_alive_timeout)
+        try:
+            return self.rfile.readline(65537)
+        finally:
+            self.server.connection_busy(self.connection)
+            self.connection.settimeout(self.timeout)
+
+    # The request body as a stream that ends where the body ends, or None when
+    # its length cannot be trusted
+    def _request_body(self, environ):
+        if environ.get('wsgi.input_terminated'):
+            return environ['wsgi.input']
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return None
+        if length < 0:
+            return None
+        environ['wsgi.input'] = LimitedStream(self.rfile, length)
+        return environ['wsgi.input']
+
+    # Werkzeug's run_wsgi with its "Connection: close" and its post-response socket
+    # drain (which waits on every request and would swallow the next request line)
+    # replaced. It relies on make_environ, connection_dropped and passthrough_errors,
+    # so requirements.txt pins the Werkzeug version it was written against; check
+    # it against the new run_wsgi before upgrading.
+    def run_wsgi(self):
+        if self.headers.get('Expect', '').lower().strip(' \t') == '100-continue':
+            self.wfile.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+
+        self.environ = environ = self.make_environ()
+        body = self._request_body(environ)
+        if body is None:
+            self.send_error(400, 'Invalid Content-Length')
+            return
+
+        status_set = headers_set = None
+        headers_sent = False
+        chunked = False
+
+        def write(data):
+            nonlocal headers_sent, chunked
+            if not headers_sent:
+                headers_sent = True
+                code, _, message = status_set.partition(' ')
+                code = int(code)
+                self.send_response(code, message)
+                header_keys = set()
+                for key, value in headers_set:
+                    self.send_header(key, value)
+                    header_keys.add(key.lower())
+
+                has_body = not (environ['REQUEST_METHOD'] == 'HEAD' or code < 200 or code in (204, 304))
+                if has_body and 'content-length' not in header_keys:
+                    if self.request_version == 'HTTP/1.1':
+                        chunked = True
+                        self.send_header('Transfer-Encoding', 'chunked')
+                    else:
+                        # Without chunked encoding the body ends where the connection does
+                        self.close_connection = True
+                if not self.server.keep_alive_allowed():
+                    self.close_connection = True
+                if 'connection' not in header_keys:
+                    if self.close_connection:
+                        self.send_header('Connection', 'close')
+                    elif self.request_version == 'HTTP/1.0':
+                        self.send_header('Connection', 'keep-alive')
+                self.end_headers()
+
+            if data:
+                if chunked:
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                else:
+                    self.wfile.write(data)
+            self.wfile.flush()
+
+        def start_response(status, headers, exc_info=None):
+            nonlocal status_set, headers_set
+            if exc_info:
+                try:
+                    if headers_sent:
+                        raise exc_info[1].with_traceback(exc_info[2])
+                finally:
+                    exc_info = None
+            elif headers_set:
+                raise AssertionError('Headers already set')
+            status_set, headers_set = status, headers
+            return write
+
+        def execute(app):
+            application_iter = app(environ, start_response)
+            try:
+                for data in application_iter:
+                    write(data)
+                if not headers_sent:
+                    write(b'')
+                if chunked:
+                    self.wfile.write(b'0\r\n\r\n')
+            finally:
+                if hasattr(application_iter, 'close'):
+                    application_iter.close()
+
+        try:
+            execute(self.server.app)
+        except (ConnectionError, socket.timeout) as e:
+            self.close_connection = True
+            self.connection_dropped(e, environ)
+            return
+        except Exception:
+            if self.server.passthrough_errors:
+                raise
+            self.log_error('Error on request:\n%s', traceback.format_exc())
+            if headers_sent:
+                # A response cut short can only be told apart by closing the connection
+                self.close_connection = True
+                return
+            status_set = headers_set = None
+            try:
+                execute(InternalServerError())
+            except Exception:
+                self.close_connection = True
+                return
+
+        # Whatever the application left unread, so the next request starts in the right place
+        if not self.close_connection:
+            try:
+                while body.read(65536):
+                    pass
+            except Exception:
+                self.close_connection = True
+
+
+class ThreadPoolWSGIServer(BaseWSGIServer):
+    multithread = True
+
+    # At most `threads` connections are served at once and `backlog` (default:
+    # `threads`) more wait for a thread
+    def __init__(self, host, port, app, threads=8, fd=None, multiprocess=False, handler=None, backlog=None):
+        self.multiprocess = multiprocess
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='wsgi')
+        self._slots = threading.BoundedSemaphore(threads + (threads if backlog is None else backlog))
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._idle = set()
+        self._stopping = False
+        super().__init__(host, port, app, handler=handler or QuietRequestHandler, fd=fd)
+
+    # Hand each accepted connection to the thread pool. When the threads and the
+    # queue are full the accept loop waits here, and new clients wait in the
+    # listen backlog where another worker can accept them.
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        with self._lock:
+            self._queued += 1
+        self.executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        with self._lock:
+            self._queued -= 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    # Kept-alive connections are closed after their current response while other
+    # connections wait for a thread, or once the server is stopping
+    def keep_alive_allowed(self):
+        return not (self._queued or self._stopping)
+
+    # Track connections waiting between requests so drain() can close them;
+    # returns False once the server is stopping
+    def connection_idle(self, conn):
+        with self._lock:
+            if self._stopping:
+                return False
+            self._idle.add(conn)
+            return True
+
+    def connection_busy(self, conn):
+        with self._lock:
+            self._idle.discard(conn)
+
+    # Stop accepting, close idle kept-alive connections and wait for the requests
+    # already being handled
+    def drain(self):
+        with self._lock:
+            self._stopping = True
+            idle, self._idle = self._idle, set()
+        for conn in idle:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.executor.shutdown(wait=True)
+
+
+# Run one worker on an already-bound socket until it is asked to stop
+def _run_worker(app, host, port, threads, fd, multiprocess, handler, on_start, on_exit):
+    if on_start:
+        on_start()
+    server = ThreadPoolWSGIServer(host, port, app, threads=threads, fd=fd,
+                                  multiprocess=multiprocess, handler=handler)
+    # Workers share the listening socket; a worker that loses the race for a
+    # connection must not block in accept() where it cannot see a shutdown
+    server.socket.setblocking(False)
+
+    # serve_forever runs on this thread, so shutdown has to come from another one
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    try:
+        server.serve_forever()
+    finally:
+        server.drain()
+        if on_exit:
+            on_exit()
+
+
+def _spawn_worker(*worker_args):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(*worker_args)
+        except BaseException:
+            code = 1
+            traceback.print_exc()
+        finally:
+            os._exit(code)
+    return pid
+
+
+# Serve `app` with `workers` processes of `threads` threads each
+def serve(app, host='127.0.0.1', port=5000, workers=1, threads=8, access_log=False,
+          on_worker_start=None, on_worker_exit=None, shutdown_timeout=30):
+    if not hasattr(os, 'fork'):
+        workers = 1
+
+    handler = type('RequestHandler', (QuietRequestHandler,), {'access_log': access_log})
+    listener = socket.create_server((host, port), backlog=1024)
+    listener.set_inheritable(True)
+    host, port = listener.getsockname()[:2]
+    print(f" * Serving on http://{host}:{port} with {workers} worker(s) x {threads} thread(s)",
+          file=sys.stderr, flush=True)
+
+    worker_args = (app, host, port, threads, listener.fileno(), workers > 1,
+                   handler, on_worker_start, on_worker_exit)
+
+    if workers == 1:
+        try:
+            _run_worker(*worker_args)
+        finally:
+            listener.close()
+        return
+
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    children = {_spawn_worker(*worker_args) for _ in range(workers)}
+
+    # Replace workers that exit on their own until a stop signal arrives
+    while not stopping.is_set():
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            stopping.wait(0.2)
+            continue
+        children.discard(pid)
+        if not stopping.is_set():
+            print(f" * Worker {pid} exited with status {status}, restarting",
+                  file=sys.stderr, flush=True)
+            children.add(_spawn_worker(*worker_args))
+
+    for pid in children:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    # Give in-flight requests time to finish, then force the stragglers
+    deadline = time.monotonic() + shutdown_timeout
+    while children and time.monotonic() < deadline:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            children.discard(pid)
+        else:
+            time.sleep(0.05)
+    for pid in children:
+        try:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+    listener.close()
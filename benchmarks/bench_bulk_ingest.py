@@ -0,0 +1,63 @@
+"""
+Users per second ingested one request at a time versus through the bulk endpoint.
+
+Runs both paths through the Flask test client against a scratch database.
+
+    python -m benchmarks.bench_bulk_ingest --users 5000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from api import mock_server
+
+
+def make_users(prefix, count):
+    return [{'username': f'{prefix}{i}', 'email': f'{prefix}{i}@example.com',
+             'first_name': 'Bench', 'last_name': 'User'} for i in range(count)]
+
+
+def one_by_one(client, users):
+    for user in users:
+        client.post('/api/users', json=user)
+
+
+def bulk_json(client, users):
+    client.post('/api/users/bulk', json={'users': users})
+
+
+def bulk_ndjson(client, users):
+    body = ''.join(json.dumps(user) + '\n' for user in users)
+    client.post('/api/users/bulk', data=body, content_type='application/x-ndjson')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        mock_server.DB_PATH = db_path
+        mock_server.init_db()
+        original, mock_server.pool = mock_server.pool, mock_server.ConnectionPool(db_path)
+        client = mock_server.app.test_client()
+
+        try:
+            for label, fn in (('one by one', one_by_one),
+                              ('bulk json', bulk_json),
+                              ('bulk ndjson', bulk_ndjson)):
+                users = make_users(label.replace(' ', '_'), args.users)
+                started = time.perf_counter()
+                fn(client, users)
+                elapsed = time.perf_counter() - started
+                print(f"{label:>12}: {args.users / elapsed:10.0f} users/s")
+        finally:
+            mock_server.pool.close()
+            mock_server.pool = original
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+GET /api/products throughput with the catalog cache on and off.
+
+Runs the route through the Flask test client against a scratch database at
+several catalog sizes.
+
+    python -m benchmarks.bench_catalog_cache --requests 2000 --products 6 1000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from api import mock_server
+
+
+def seed_products(db_path, count):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('DELETE FROM products')
+        conn.executemany(
+            'INSERT INTO products (id, name, price, stock, description) VALUES (?, ?, ?, ?, ?)',
+            ((i, f'Product {i}', 9.99, 100, 'Benchmark product') for i in range(1, count + 1)))
+
+
+def run_requests(client, total):
+    started = time.perf_counter()
+    for _ in range(total):
+        client.get('/api/products')
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--products', type=int, nargs='+', default=[6, 1000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        mock_server.DB_PATH = db_path
+        mock_server.init_db()
+        original, mock_server.pool = mock_server.pool, mock_server.ConnectionPool(db_path)
+        client = mock_server.app.test_client()
+
+        try:
+            print(f"{'products':>8} {'uncached req/s':>15} {'cached req/s':>13} {'speedup':>8}")
+            for size in args.products:
+                seed_products(db_path, size)
+                mock_server.catalog_cache.invalidate()
+                rates = {}
+                for enabled in (False, True):
+                    mock_server.app.config['CATALOG_CACHE'] = enabled
+                    run_requests(client, 20)
+                    rates[enabled] = run_requests(client, args.requests)
+                print(f"{size:>8} {rates[False]:>15.0f} {rates[True]:>13.0f} {rates[True] / rates[False]:>7.1f}x")
+        finally:
+            mock_server.pool.close()
+            mock_server.pool = original
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Before/after throughput of the mock server connection layer.
+
+Runs the read and write routes through the Flask test client twice against a
+scratch copy of the database: once opening a fresh connection per request (the
+old behaviour) and once through the pooled, WAL-tuned connections.
+
+    python -m benchmarks.bench_connection_pool --requests 2000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from api import mock_server
+
+
+# Old behaviour: a brand new connection for every request, closed afterwards
+class PerRequestConnections:
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def acquire(self):
+        return sqlite3.connect(self.db_path)
+
+    def release(self, conn):
+        conn.close()
+
+    def close(self):
+        pass
+
+
+def run_requests(client, total):
+    started = time.perf_counter()
+    for i in range(total):
+        if i % 4 == 0:
+            client.put('/api/products/1/stock', json={'stock': 100})
+        elif i % 4 == 1:
+            client.get('/api/users/1')
+        else:
+            client.get('/api/products')
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        mock_server.DB_PATH = db_path
+        mock_server.init_db()
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('''
+                INSERT INTO users (username, email, first_name, last_name)
+                VALUES ('bench', 'bench@example.com', 'Bench', 'User')
+            ''')
+        client = mock_server.app.test_client()
+
+        results = {}
+        for label, pool in (('per-request', PerRequestConnections(db_path)),
+                            ('pooled', mock_server.ConnectionPool(db_path))):
+            original, mock_server.pool = mock_server.pool, pool
+            try:
+                run_requests(client, 50)
+                results[label] = run_requests(client, args.requests)
+            finally:
+                mock_server.pool = original
+                pool.close()
+
+    for label, rate in results.items():
+        print(f"{label:>12}: {rate:8.0f} req/s")
+    print(f"{'speedup':>12}: {results['pooled'] / results['per-request']:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Cost of POST /api/orders as the cart grows from 1 to 1000 line items.
+
+Seeds a scratch database with enough products and stock for every cart size,
+then times order creation through the Flask test client.
+
+    python -m benchmarks.bench_create_order --orders 20
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from api import mock_server
+
+CART_SIZES = (1, 10, 100, 1000)
+
+
+def seed(db_path, products):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('''
+            INSERT INTO users (username, email, first_name, last_name)
+            VALUES ('bench', 'bench@example.com', 'Bench', 'User')
+        ''')
+        conn.executemany(
+            'INSERT OR REPLACE INTO products (id, name, price, stock) VALUES (?, ?, ?, ?)',
+            [(i, f'Product {i}', 1.5, 10 ** 9) for i in range(1, products + 1)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=20, help='orders per cart size')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        mock_server.DB_PATH = db_path
+        mock_server.init_db()
+        seed(db_path, max(CART_SIZES))
+        original, mock_server.pool = mock_server.pool, mock_server.ConnectionPool(db_path)
+        client = mock_server.app.test_client()
+
+        try:
+            print(f"{'items':>6} {'ms/order':>10} {'us/item':>10}")
+            for size in CART_SIZES:
+                order = {'user_id': 1, 'items': [
+                    {'product_id': i, 'quantity': 1} for i in range(1, size + 1)]}
+                client.post('/api/orders', json=order)
+
+                started = time.perf_counter()
+                for _ in range(args.orders):
+                    response = client.post('/api/orders', json=order)
+                    assert response.status_code == 201, response.get_json()
+                elapsed = (time.perf_counter() - started) / args.orders
+
+                print(f"{size:>6} {elapsed * 1000:>10.2f} {elapsed * 1e6 / size:>10.1f}")
+        finally:
+            mock_server.pool.close()
+            mock_server.pool = original
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+DELETE-based cleanup vs snapshot restore as the database grows.
+
+Seeds scratch databases of increasing size, then times one reset after a
+test-sized write: cleanup_test_data plus reset_product_stocks (the old way) and
+restoring a snapshot captured in memory and, with --snapshot-dir, on a tmpfs.
+The snapshot is re-captured before each DELETE-based reset so every reset
+starts from the same data.
+
+    python -m benchmarks.bench_db_reset --scales 10k,100k,1m --snapshot-dir /dev/shm
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from utils.db_utils import DatabaseUtils
+from utils.seeder import parse_count
+
+
+# What a test typically leaves behind
+def write_test_data(db):
+    with db.transaction():
+        db.execute_update("INSERT INTO users (username, email, first_name, last_name) "
+                          "VALUES ('testbench', 'testbench@example.com', 'Test', 'Bench')")
+        db.execute_update('UPDATE products SET stock = stock - 1 WHERE id = 1')
+
+
+def time_delete_cleanup(db, snapshot, repeat):
+    samples = []
+    for _ in range(repeat):
+        db.restore(snapshot)
+        write_test_data(db)
+        started = time.perf_counter()
+        db.cleanup_test_data()
+        db.reset_product_stocks()
+        samples.append(time.perf_counter() - started)
+    db.restore(snapshot)
+    return samples
+
+
+def time_restore(db, snapshot, repeat):
+    samples = []
+    for _ in range(repeat):
+        write_test_data(db)
+        samples.append(db.restore(snapshot))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', default='10k,100k,1m', help='users and orders per database, e.g. 10k,1m')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--snapshot-dir', help='also time a file snapshot kept in this directory (e.g. a tmpfs)')
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'db MB':>7} {'DELETE ms':>10} {'memory ms':>10} {'file ms':>10}")
+    for rows in (parse_count(scale) for scale in args.scales.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseUtils(os.path.join(tmp, 'bench.db'))
+            db.seed(users=rows, products=max(6, rows // 1000), orders=rows, items_per_order=1)
+            db.execute_update('PRAGMA wal_checkpoint(TRUNCATE)')
+            size = os.path.getsize(db.db_path) / 2 ** 20
+
+            in_memory = db.snapshot(location=None)
+            delete = statistics.median(time_delete_cleanup(db, in_memory, args.repeat))
+            memory = statistics.median(time_restore(db, in_memory, args.repeat))
+            in_memory.close()
+
+            on_disk = '-'
+            if args.snapshot_dir:
+                snapshot = db.snapshot(location=args.snapshot_dir)
+                on_disk = f"{statistics.median(time_restore(db, snapshot, args.repeat)) * 1000:10.1f}"
+                snapshot.close()
+            db.close()
+
+        print(f"{rows:>8} {size:>7.1f} {delete * 1000:>10.1f} {memory * 1000:>10.1f} {on_disk:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Before/after cost of the DatabaseUtils calls made by the DB validation suite.
+
+Replays the lookups tests/integration/test_db_validations.py makes (user count,
+user by username, product stock, order details, item counts, orders by user,
+stock updates and stock resets) against a scratch copy of the database, once
+with a plain sqlite3.connect for every call (the old behaviour) and once reusing
+a per-thread connection with a prepared-statement cache.
+
+--suite also runs tests/integration/test_db_validations.py itself in both
+modes, against a private mock server, and reports the time spent in the test
+bodies. The pytest subprocess loads this module as a plugin to swap in the old
+connection handling.
+
+    python -m benchmarks.bench_db_utils --rounds 2000
+    python -m benchmarks.bench_db_utils --rounds 2000 --suite
+"""
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+from api import mock_server
+from utils import db_utils
+from utils.db_utils import DatabaseUtils
+
+SUITE = 'tests/integration/test_db_validations.py'
+
+
+# Old behaviour: a plain connection for every call, without the tuning pragmas,
+# closed afterwards
+class PlainConnectionPerCall(DatabaseUtils):
+    def __init__(self, db_path=None):
+        super().__init__(db_path, reuse_connections=False)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+
+def seed(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('''
+            INSERT INTO users (username, email, first_name, last_name)
+            VALUES ('bench', 'bench@example.com', 'Bench', 'User')
+        ''')
+        conn.execute("INSERT INTO orders (id, user_id, total_amount, status) VALUES ('order-1', 1, 29.99, 'completed')")
+        conn.execute("INSERT INTO order_items (order_id, product_id, quantity, price) VALUES ('order-1', 1, 1, 29.99)")
+
+
+# One round of the calls a typical validation test makes
+def validation_round(db):
+    db.get_user_count()
+    db.get_user_by_username('bench')
+    db.get_product_stock(1)
+    db.get_order_details('order-1')
+    db.get_order_items_count('order-1')
+    db.get_orders_by_user(1)
+    db.update_product_stock(1, 10)
+    db.get_product_stock(1)
+
+
+def run(db, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        validation_round(db)
+    db.reset_product_stocks()
+    return (time.perf_counter() - started) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--suite', action='store_true', help=f'also time {SUITE} in both modes')
+    parser.add_argument('--suite-runs', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        original_path = mock_server.DB_PATH
+        mock_server.DB_PATH = db_path
+        try:
+            mock_server.init_db()
+        finally:
+            mock_server.DB_PATH = original_path
+        seed(db_path)
+
+        results = {}
+        for label, db in (('per-call', PlainConnectionPerCall(db_path)),
+                          ('reused', DatabaseUtils(db_path))):
+            run(db, 50)
+            results[label] = run(db, args.rounds)
+            db.close()
+
+    for label, seconds in results.items():
+        print(f"{label:>9}: {seconds * 1e6:8.1f} us/round  ({1 / seconds:8.0f} rounds/s)")
+    print(f"{'speedup':>9}: {results['per-call'] / results['reused']:8.2f}x")
+
+    if args.suite:
+        suite = {label: min(run_suite(label) for _ in range(args.suite_runs))
+                 for label in ('per-call', 'reused')}
+        print(f"\n{SUITE} (time in test bodies, best of {args.suite_runs})")
+        for label, seconds in suite.items():
+            print(f"{label:>9}: {seconds * 1000:8.1f} ms")
+        print(f"{'speedup':>9}: {suite['per-call'] / suite['reused']:8.2f}x")
+
+
+# Run the validation suite in a subprocess and return the seconds spent in its test bodies
+def run_suite(mode):
+    with tempfile.TemporaryDirectory() as tmp:
+        result = os.path.join(tmp, 'seconds')
+        env = dict(os.environ, BENCH_DB_UTILS_MODE=mode, BENCH_DB_UTILS_RESULT=result)
+        subprocess.run([sys.executable, '-m', 'pytest', SUITE, '-q', '-p', 'no:cacheprovider',
+                        '--isolated-server', '-p', 'benchmarks.bench_db_utils'],
+                       env=env, stdout=subprocess.DEVNULL, check=False)
+        with open(result) as f:
+            return float(f.read())
+
+
+# Plugin hooks, active only in the pytest subprocess started by run_suite
+def pytest_configure(config):
+    config._bench_seconds = 0.0
+    # The suite imports DatabaseUtils after this, at collection time
+    if os.getenv('BENCH_DB_UTILS_MODE') == 'per-call':
+        db_utils.DatabaseUtils = PlainConnectionPerCall
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    started = time.perf_counter()
+    yield
+    item.config._bench_seconds += time.perf_counter() - started
+
+
+def pytest_sessionfinish(session):
+    path = os.getenv('BENCH_DB_UTILS_RESULT')
+    if path:
+        with open(path, 'w') as f:
+            f.write(str(session.config._bench_seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Concurrent-oversell stress run against a live mock server.
+
+Fires N simultaneous single-unit orders at one product whose stock is smaller
+than N, checks that exactly `stock` orders succeed and the product ends at
+zero, and reports throughput plus the server's contention-retry count.
+
+    python api/mock_server.py &
+    python -m benchmarks.bench_order_contention --orders 200 --stock 50 --threads 32
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.endpoints.orders_api import OrdersAPI
+from api.endpoints.products_api import ProductsAPI
+from api.endpoints.users_api import UsersAPI
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default='http://localhost:5000/api')
+    parser.add_argument('--orders', type=int, default=200)
+    parser.add_argument('--stock', type=int, default=50)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--product-id', type=int, default=1)
+    args = parser.parse_args()
+
+    products_api = ProductsAPI(args.base_url)
+    users_api = UsersAPI(args.base_url)
+    orders_api = OrdersAPI(args.base_url)
+
+    original_stock = products_api.get_product_by_id(args.product_id)['stock']
+    user_id = users_api.create_valid_user()[0].json()['id']
+    products_api.update_product_stock(args.product_id, args.stock)
+    retries_before = orders_api.get('/stats').json()['stats'].get('contention_retries', 0)
+
+    def place_order(_):
+        client = OrdersAPI(args.base_url)
+        return client.create_simple_order(user_id, args.product_id, 1).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        status_codes = list(executor.map(place_order, range(args.orders)))
+    elapsed = time.perf_counter() - started
+
+    final_stock = products_api.get_product_by_id(args.product_id)['stock']
+    retries = orders_api.get('/stats').json()['stats'].get('contention_retries', 0) - retries_before
+    products_api.update_product_stock(args.product_id, original_stock)
+
+    created = status_codes.count(201)
+    rejected = status_codes.count(400)
+    print(f"orders sent:         {args.orders}")
+    print(f"created / rejected:  {created} / {rejected}")
+    print(f"other statuses:      {args.orders - created - rejected}")
+    print(f"final stock:         {final_stock}")
+    print(f"throughput:          {args.orders / elapsed:.0f} orders/s")
+    print(f"contention retries:  {retries}")
+
+    oversold = created > args.stock or final_stock < 0
+    assert not oversold, f"Oversold: {created} orders created for {args.stock} units"
+    assert final_stock == args.stock - created, "Stock does not match the created orders"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Per-route micro-benchmarks for the mock server, with a stored baseline.
+
+Drives get_users, get_products, create_user, create_order, get_order and
+update_product_stock through the Flask test client and over real HTTP, against
+scratch databases seeded with 1k, 100k or 1M users and orders. Results are
+written to JSON. `compare` flags routes whose throughput dropped by more than
+--threshold, or whose p95 latency grew by more than the looser
+--latency-threshold (tail latency is noisier than throughput).
+
+    python -m benchmarks.bench_routes run --scales 1k,100k --output benchmarks/baseline.json
+    python -m benchmarks.bench_routes run --scales 1k,100k --compare benchmarks/baseline.json
+    python -m benchmarks.bench_routes compare benchmarks/baseline.json reports/bench_routes.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from api import mock_server, session_registry
+from api.wsgi_server import ThreadPoolWSGIServer
+from utils.db_utils import DatabaseUtils
+from utils.latency import LatencyHistogram
+from utils.seeder import parse_count
+
+ROUTES = ['get_users', 'get_products', 'create_user', 'create_order', 'get_order', 'update_product_stock']
+TRANSPORTS = ['client', 'http']
+# Orders whose IDs are kept for get_order, picked at random after seeding
+ORDER_SAMPLE = 10_000
+
+
+def scale_label(rows):
+    for suffix, size in (('m', 1_000_000), ('k', 1_000)):
+        if rows >= size and rows % size == 0:
+            return f"{rows // size}{suffix}"
+    return str(rows)
+
+
+# Seed `rows` users and orders (one item each) plus a product per 1000 rows with
+# utils/seeder.py. Returns the product count and a sample of order IDs.
+def seed(db_path, rows):
+    db = DatabaseUtils(db_path)
+    try:
+        db.seed(users=rows, products=max(6, rows // 1000), orders=rows, items_per_order=1)
+        # Stock never runs out during a benchmark
+        db.execute_update('UPDATE products SET stock = 1000000000')
+        products = db.execute_query('SELECT COUNT(*) FROM products')[0][0]
+        orders = db.execute_query('SELECT MAX(rowid) FROM orders')[0][0]
+        rowids = random.sample(range(1, orders + 1), min(ORDER_SAMPLE, orders))
+        order_ids = [row[0] for row in db.execute_query(
+            'SELECT id FROM orders WHERE rowid IN (SELECT value FROM json_each(?))', (json.dumps(rowids),))]
+    finally:
+        db.close()
+    return products, order_ids
+
+
+# Build (method, path, body) for one call of a route
+def make_request(route, rows, products, order_ids):
+    if route == 'get_users':
+        return 'GET', f'/api/users?after_id={random.randint(0, rows)}&limit=100', None
+    if route == 'get_products':
+        return 'GET', '/api/products', None
+    if route == 'create_user':
+        name = uuid.uuid4().hex
+        return 'POST', '/api/users', {'username': name, 'email': f'{name}@example.com',
+                                      'first_name': 'Bench', 'last_name': 'User'}
+    if route == 'create_order':
+        return 'POST', '/api/orders', {'user_id': random.randint(1, rows), 'items': [
+            {'product_id': random.randint(1, products), 'quantity': 1}]}
+    if route == 'get_order':
+        return 'GET', f'/api/orders/{random.choice(order_ids)}', None
+    if route == 'update_product_stock':
+        return 'PUT', f'/api/products/{random.randint(1, products)}/stock', {'stock': 1000000000}
+    raise ValueError(route)
+
+
+# Send requests through the Flask test client
+def client_sender(client):
+    def send(method, path, body):
+        return client.open(path, method=method, json=body).status_code
+    return send
+
+
+# Send requests over HTTP to a server running in this process
+def http_sender(base_url):
+    session = session_registry.get_session(base_url)
+
+    def send(method, path, body):
+        return session.request(method, f'{base_url}{path}', json=body).status_code
+    return send
+
+
+def measure(send, route, rows, products, order_ids, iterations, warmup):
+    for _ in range(warmup):
+        send(*make_request(route, rows, products, order_ids))
+    histogram = LatencyHistogram()
+    failures = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        request = make_request(route, rows, products, order_ids)
+        call_started = time.perf_counter()
+        status = send(*request)
+        histogram.record(time.perf_counter() - call_started)
+        failures += status >= 400
+    elapsed = time.perf_counter() - started
+    return {
+        'ops_per_s': round(iterations / elapsed, 1),
+        'p50_ms': round(histogram.percentile(50) * 1000, 3),
+        'p95_ms': round(histogram.percentile(95) * 1000, 3),
+        'p99_ms': round(histogram.percentile(99) * 1000, 3),
+        'failures': failures,
+    }
+
+
+def run(args):
+    results = {}
+    routes = args.routes.split(',')
+    transports = args.transports.split(',')
+    original_path = mock_server.DB_PATH
+
+    for rows in (parse_count(scale) for scale in args.scales.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'bench.db')
+            mock_server.configure_database(db_path)
+            mock_server.init_db()
+            started = time.perf_counter()
+            products, order_ids = seed(db_path, rows)
+            mock_server.catalog_cache.invalidate()
+            print(f"seeded {scale_label(rows)} rows in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+            server = ThreadPoolWSGIServer('127.0.0.1', 0, mock_server.app, threads=8)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            senders = {
+                'client': client_sender(mock_server.app.test_client()),
+                'http': http_sender(f'http://127.0.0.1:{server.server_port}'),
+            }
+            try:
+                for transport in transports:
+                    for route in routes:
+                        key = f'{scale_label(rows)}/{transport}/{route}'
+                        results[key] = measure(senders[transport], route, rows, products, order_ids,
+                                               args.iterations, args.warmup)
+                        print(f"{key:<40} {results[key]['ops_per_s']:>9.0f} ops/s "
+                              f"p50 {results[key]['p50_ms']:>7.3f} ms  p95 {results[key]['p95_ms']:>7.3f} ms",
+                              file=sys.stderr)
+            finally:
+                server.shutdown()
+                server.server_close()
+                server.drain()
+                mock_server.configure_database(original_path)
+
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'iterations': args.iterations,
+        },
+        'results': results,
+    }
+
+
+# Regressions between two result files: throughput down by more than `threshold`
+# or p95 latency up by more than `latency_threshold`
+def compare(baseline, current, threshold, latency_threshold):
+    regressions = []
+    lines = [f"{'benchmark':<40} {'ops/s':>10} {'baseline':>10} {'change':>8} {'p95 ms':>9} {'baseline':>9}"]
+    for key, result in current['results'].items():
+        before = baseline['results'].get(key)
+        if before is None:
+            lines.append(f"{key:<40} {result['ops_per_s']:>10.0f} {'-':>10} {'new':>8}")
+            continue
+        change = result['ops_per_s'] / before['ops_per_s'] - 1
+        slower = change < -threshold or result['p95_ms'] > before['p95_ms'] * (1 + latency_threshold)
+        lines.append(f"{key:<40} {result['ops_per_s']:>10.0f} {before['ops_per_s']:>10.0f} "
+                     f"{change:>+8.1%} {result['p95_ms']:>9.3f} {before['p95_ms']:>9.3f}"
+                     f"{'  REGRESSION' if slower else ''}")
+        if slower:
+            regressions.append(key)
+    return regressions, '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmarks and write the results')
+    run_parser.add_argument('--scales', default='1k,100k,1m', help='rows per table, e.g. 1k,100k,1m')
+    run_parser.add_argument('--routes', default=','.join(ROUTES))
+    run_parser.add_argument('--transports', default=','.join(TRANSPORTS))
+    run_parser.add_argument('--iterations', type=int, default=500)
+    run_parser.add_argument('--warmup', type=int, default=50)
+    run_parser.add_argument('--output', default='reports/bench_routes.json')
+    run_parser.add_argument('--compare', metavar='BASELINE', help='compare the results with a baseline file')
+    run_parser.add_argument('--threshold', type=float, default=0.15)
+    run_parser.add_argument('--latency-threshold', type=float, default=0.5)
+
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.15)
+    compare_parser.add_argument('--latency-threshold', type=float, default=0.5)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        current = run(args)
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as output:
+            json.dump(current, output, indent=2)
+            output.write('\n')
+        print(f"results written to {args.output}", file=sys.stderr)
+        baseline_path = args.compare
+    else:
+        with open(args.current) as current_file:
+            current = json.load(current_file)
+        baseline_path = args.baseline
+
+    if not baseline_path:
+        return 0
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions, table = compare(baseline, current, args.threshold, args.latency_threshold)
+    print(table)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("no regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
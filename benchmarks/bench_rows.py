@@ -0,0 +1,96 @@
+"""
+Memory per row and construction cost of the row representations.
+
+Fetches the same users rows from an in-memory database as plain tuples, the
+typed NamedTuples in utils/rows.py, slotted dataclasses, sqlite3.Row and dicts,
+and reports the fetch time per row and the memory each row object adds on top
+of its column values (tracemalloc, with the values counted once for all kinds).
+
+    python -m benchmarks.bench_rows --rows 200000
+"""
+import argparse
+import dataclasses
+import gc
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+from utils.rows import User, row_factory
+from utils.schema import migrate
+
+
+@dataclasses.dataclass(slots=True)
+class SlottedUser:
+    id: int
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+    created_at: str
+
+
+def dict_factory(cursor, row):
+    return dict(zip([column[0] for column in cursor.description], row))
+
+
+FACTORIES = {
+    'tuple': None,
+    'NamedTuple': row_factory(User),
+    'slotted dataclass': lambda cursor, row: SlottedUser(*row),
+    'sqlite3.Row': sqlite3.Row,
+    'dict': dict_factory,
+}
+
+
+def fetch(conn, factory):
+    cursor = conn.cursor()
+    cursor.row_factory = factory
+    return cursor.execute('SELECT * FROM users').fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(':memory:')
+    migrate(conn)
+    conn.executemany('INSERT INTO users (username, email, first_name, last_name, created_at) VALUES (?, ?, ?, ?, ?)',
+                     ((f'user{i}', f'user{i}@example.com', 'Bench', 'User', '2026-01-01 00:00:00')
+                      for i in range(args.rows)))
+
+    # Memory of the column values alone, from a plain tuple fetch
+    gc.collect()
+    tracemalloc.start()
+    baseline_rows = fetch(conn, None)
+    values_bytes = tracemalloc.get_traced_memory()[0] - sys.getsizeof(baseline_rows) \
+        - args.rows * sys.getsizeof(baseline_rows[0])
+    tracemalloc.stop()
+    del baseline_rows
+
+    print(f"{'rows as':<18} {'us/row':>8} {'bytes/row':>10} {'vs tuple':>9}")
+    tuple_bytes = None
+    for label, factory in FACTORIES.items():
+        best = min(_timed(conn, factory) for _ in range(args.repeat))
+
+        gc.collect()
+        tracemalloc.start()
+        rows = fetch(conn, factory)
+        total = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        per_row = (total - sys.getsizeof(rows) - values_bytes) / args.rows
+        del rows
+        tuple_bytes = tuple_bytes or per_row
+        print(f"{label:<18} {best / args.rows * 1e6:>8.3f} {per_row:>10.0f} {per_row / tuple_bytes:>8.2f}x")
+
+
+def _timed(conn, factory):
+    started = time.perf_counter()
+    fetch(conn, factory)
+    return time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Requests per second of `mock_server serve` with 1 worker versus N workers.
+
+Starts the production server as a subprocess on a scratch copy of the
+database for each worker count, then drives a read-heavy mix from several
+client processes (each with its own keep-alive sessions) for a fixed time.
+
+    python -m benchmarks.bench_serve_workers --workers 1 4 --seconds 10
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+PATHS = ('/api/products', '/api/products/1', '/api/users?limit=20', '/api/products/2')
+
+
+# One client process: `threads` sessions looping over PATHS until the deadline
+def client_process(base_url, threads, deadline, results):
+    counts = [0] * threads
+    errors = [0] * threads
+
+    def loop(slot):
+        session = requests.Session()
+        i = 0
+        while time.time() < deadline:
+            try:
+                response = session.get(base_url + PATHS[i % len(PATHS)])
+                if response.ok:
+                    counts[slot] += 1
+                else:
+                    errors[slot] += 1
+            except requests.RequestException:
+                errors[slot] += 1
+            i += 1
+
+    workers = [threading.Thread(target=loop, args=(slot,)) for slot in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put((sum(counts), sum(errors)))
+
+
+def wait_until_up(base_url, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(base_url + '/api/products/1', timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.1)
+    raise RuntimeError('Server did not start')
+
+
+def measure(workers, args, db_path):
+    port = args.port
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'api.mock_server', 'serve', '--workers', str(workers),
+         '--threads', str(args.threads), '--db', db_path, '--port', str(port)],
+        stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        wait_until_up(base_url)
+        results = multiprocessing.Queue()
+        deadline = time.time() + args.seconds
+        clients = [multiprocessing.Process(target=client_process,
+                                           args=(base_url, args.client_threads, deadline, results))
+                   for _ in range(args.clients)]
+        for client in clients:
+            client.start()
+        totals = [results.get() for _ in clients]
+        for client in clients:
+            client.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    ok = sum(count for count, _ in totals)
+    errors = sum(error for _, error in totals)
+    return ok / args.seconds, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 2])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--clients', type=int, default=4, help='client processes')
+    parser.add_argument('--client-threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--port', type=int, default=5077)
+    parser.add_argument('--db', default='ecommerce_test.db', help='database to copy for the runs')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        shutil.copyfile(args.db, db_path)
+
+        print(f"{'workers':>8} {'req/s':>10} {'errors':>8}")
+        for workers in args.workers:
+            rate, errors = measure(workers, args, db_path)
+            print(f"{workers:>8} {rate:>10.0f} {errors:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Peak memory and time of listing every user at growing table sizes.
+
+Compares materialising the whole table into one JSON payload (the old
+behaviour) with NDJSON streaming and keyset pages, all through the Flask test
+client against a scratch database.
+
+    python -m benchmarks.bench_users_listing --users 10000 100000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from api import mock_server
+
+
+def seed_users(db_path, count):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('DELETE FROM users')
+        conn.executemany(
+            'INSERT INTO users (id, username, email, first_name, last_name) VALUES (?, ?, ?, ?, ?)',
+            ((i, f'user{i}', f'user{i}@example.com', 'Bench', 'User') for i in range(1, count + 1)))
+
+
+def full_payload(client):
+    with mock_server.app.app_context():
+        rows = mock_server.get_db().execute('SELECT * FROM users').fetchall()
+        body = json.dumps({'users': [mock_server.user_to_dict(row) for row in rows]})
+    return body.count('"id"')
+
+
+def ndjson_stream(client):
+    response = client.get('/api/users?format=ndjson')
+    count = sum(1 for chunk in response.response for _ in chunk.splitlines() if _)
+    response.close()
+    return count
+
+
+def keyset_pages(client):
+    count, after_id = 0, 0
+    while after_id is not None:
+        page = client.get(f'/api/users?after_id={after_id}&limit={mock_server.MAX_PAGE_SIZE}').get_json()
+        count += len(page['users'])
+        after_id = page['next_after_id']
+    return count
+
+
+def measure(fn, client):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = fn(client)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        mock_server.DB_PATH = db_path
+        mock_server.init_db()
+        original, mock_server.pool = mock_server.pool, mock_server.ConnectionPool(db_path)
+        client = mock_server.app.test_client()
+
+        try:
+            print(f"{'users':>8} {'mode':>14} {'rows':>8} {'seconds':>8} {'peak MiB':>9}")
+            for size in args.users:
+                seed_users(db_path, size)
+                for label, fn in (('full payload', full_payload),
+                                  ('ndjson stream', ndjson_stream),
+                                  ('keyset pages', keyset_pages)):
+                    count, elapsed, peak = measure(fn, client)
+                    print(f"{size:>8} {label:>14} {count:>8} {elapsed:>8.2f} {peak / 2 ** 20:>9.1f}")
+        finally:
+            mock_server.pool.close()
+            mock_server.pool = original
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+"""
+Open-loop load generator for the mock e-commerce API.
+
+Starts weighted user journeys at a scheduled arrival rate, independently of how
+fast earlier journeys finish. Journey latency is measured from the scheduled
+start, so time spent queued behind a slow server is counted instead of hidden
+(no coordinated omission). Each interval prints a JSON line with the live
+throughput, error rate and latency percentiles. The final summary is printed as
+one JSON document and can be written to --output for comparing runs.
+
+    python api/mock_server.py &
+    python -m benchmarks.loadgen --profile constant --rate 50 --duration 30
+    python -m benchmarks.loadgen --profile ramp --rate 10 --to-rate 200 --duration 60 --processes 4
+    python -m benchmarks.loadgen --profile step --steps 20,50,100 --duration 30 \\
+        --journey browse=6 --journey purchase=3 --journey signup=1 --output reports/load.json
+"""
+import argparse
+import json
+import multiprocessing
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from api.endpoints.orders_api import OrdersAPI
+from api.endpoints.products_api import ProductsAPI
+from api.endpoints.users_api import UsersAPI
+from api.retry_policy import NO_RETRY
+from utils.helpers import TestHelpers
+from utils.latency import LatencyHistogram
+
+DEFAULT_JOURNEYS = {'browse': 6, 'purchase': 3, 'signup': 1}
+
+
+# Arrival rate in journeys per second at `elapsed` seconds into the run
+def arrival_rate(args, elapsed):
+    if args.profile == 'ramp':
+        return args.rate + (args.to_rate - args.rate) * min(elapsed / args.duration, 1)
+    if args.profile == 'step':
+        steps = [float(rate) for rate in args.steps.split(',')]
+        step = min(int(elapsed / (args.duration / len(steps))), len(steps) - 1)
+        return steps[step]
+    return args.rate
+
+
+# Latencies and outcomes of the journeys that finished since the last drain
+class Recorder:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.histograms = {}
+        self.counts = Counter()
+        self.errors = Counter()
+
+    def record(self, kind, name, seconds, error=None):
+        with self._lock:
+            histogram = self.histograms.get((kind, name))
+            if histogram is None:
+                histogram = self.histograms[(kind, name)] = LatencyHistogram()
+            histogram.record(seconds)
+            self.counts[(kind, name)] += 1
+            if error:
+                self.counts[(kind, f"{name}:errors")] += 1
+                if kind == 'step':
+                    self.errors[error] += 1
+
+    def drain(self):
+        with self._lock:
+            snapshot = (self.histograms, self.counts, self.errors)
+            self._reset()
+        return snapshot
+
+
+class StepFailed(Exception):
+    pass
+
+
+# Journeys built on the endpoint clients. Every step is timed on its own and the
+# journey stops at the first failed step.
+class Journeys:
+
+    def __init__(self, base_url, recorder):
+        self.recorder = recorder
+        # No retries: the load test should see the errors the server returns
+        self.users_api = UsersAPI(base_url, retry_policy=NO_RETRY)
+        self.products_api = ProductsAPI(base_url, retry_policy=NO_RETRY)
+        self.orders_api = OrdersAPI(base_url, retry_policy=NO_RETRY)
+        self.product_ids = [product['id'] for product in self.products_api.get_all_products().json()['products']]
+
+    def step(self, name, call, expected_status):
+        started = time.perf_counter()
+        error = None
+        try:
+            response = call()
+            if response.status_code != expected_status:
+                error = f"{name} {response.status_code}"
+        except Exception as exc:
+            response, error = None, f"{name} {type(exc).__name__}"
+        self.recorder.record('step', name, time.perf_counter() - started, error)
+        if error:
+            raise StepFailed(error)
+        return response
+
+    def browse(self):
+        self.step('GET /products', self.products_api.get_all_products, 200)
+        product_id = random.choice(self.product_ids)
+        self.step('GET /products/<id>', lambda: self.products_api.get_product(product_id), 200)
+
+    # Suffix the generated names so load runs do not fail on duplicate users
+    def signup(self):
+        user_data = TestHelpers.generate_test_user()
+        suffix = uuid.uuid4().hex[:10]
+        user_data['username'] = f"{user_data['username']}_{suffix}"
+        user_data['email'] = f"{suffix}.{user_data['email']}"
+        return self.step('POST /users', lambda: self.users_api.create_user(user_data), 201).json()['id']
+
+    def purchase(self):
+        self.step('GET /products', self.products_api.get_all_products, 200)
+        user_id = self.signup()
+        product_id = random.choice(self.product_ids)
+        order = self.step('POST /orders',
+                          lambda: self.orders_api.create_simple_order(user_id, product_id, 1), 201).json()
+        self.step('GET /orders/<id>', lambda: self.orders_api.get_order_by_id(order['order_id']), 200)
+
+    # Run one journey, timing it from when it was scheduled to start
+    def run(self, name, scheduled_at):
+        error = None
+        try:
+            getattr(self, name)()
+        except StepFailed as exc:
+            error = str(exc)
+        self.recorder.record('journey', name, time.perf_counter() - scheduled_at, error)
+
+
+# Schedule journeys at the arrival rate until the run ends; runs in each worker process
+def run_worker(args, journey_weights, rate_share, results, seed):
+    random.seed(seed)
+    recorder = Recorder()
+    journeys = Journeys(args.base_url, recorder)
+    names, weights = zip(*journey_weights.items())
+    in_flight = Counter()
+    in_flight_lock = threading.Lock()
+    max_backlog = 0
+
+    def run_journey(name, scheduled_at):
+        try:
+            journeys.run(name, scheduled_at)
+        finally:
+            with in_flight_lock:
+                in_flight['journeys'] -= 1
+
+    executor = ThreadPoolExecutor(max_workers=args.threads, thread_name_prefix='loadgen')
+    started = time.perf_counter()
+    next_arrival = started
+    next_report = started + args.interval
+    end = started + args.duration
+    scheduled = 0
+
+    while next_arrival < end:
+        now = time.perf_counter()
+        if now >= next_report:
+            results.put(('interval', recorder.drain(), scheduled, max_backlog))
+            scheduled, max_backlog = 0, 0
+            next_report += args.interval
+        if next_arrival > now:
+            time.sleep(min(next_arrival - now, next_report - now))
+            continue
+
+        # Journeys are submitted at their scheduled time even when the pool is busy;
+        # the wait then shows up in their latency
+        with in_flight_lock:
+            in_flight['journeys'] += 1
+            max_backlog = max(max_backlog, in_flight['journeys'] - args.threads)
+        executor.submit(run_journey, random.choices(names, weights)[0], next_arrival)
+        scheduled += 1
+
+        rate = arrival_rate(args, next_arrival - started) * rate_share
+        gap = 1 / rate if rate > 0 else args.interval
+        next_arrival += random.expovariate(1 / gap) if args.poisson else gap
+
+    executor.shutdown(wait=True)
+    results.put(('interval', recorder.drain(), scheduled, max_backlog))
+    results.put(('done', None, 0, 0))
+
+
+# Percentiles in milliseconds for one histogram
+def latency_summary(histogram, count, errors):
+    return {
+        'count': count,
+        'errors': errors,
+        'error_rate': round(errors / count, 4) if count else 0.0,
+        'p50_ms': round(histogram.percentile(50) * 1000, 2),
+        'p95_ms': round(histogram.percentile(95) * 1000, 2),
+        'p99_ms': round(histogram.percentile(99) * 1000, 2),
+        'max_ms': round(histogram.max * 1000, 2),
+    }
+
+
+def summarize(histograms, counts, kind):
+    return {name: latency_summary(histogram, counts[(kind, name)], counts[(kind, f"{name}:errors")])
+            for (histogram_kind, name), histogram in sorted(histograms.items()) if histogram_kind == kind}
+
+
+def merge(totals, snapshot):
+    histograms, counts, errors = snapshot
+    for key, histogram in histograms.items():
+        totals[0].setdefault(key, LatencyHistogram()).merge(histogram)
+    totals[1].update(counts)
+    totals[2].update(errors)
+
+
+def parse_journeys(specs):
+    if not specs:
+        return dict(DEFAULT_JOURNEYS)
+    weights = {}
+    for spec in specs:
+        name, _, weight = spec.partition('=')
+        if name not in DEFAULT_JOURNEYS:
+            raise SystemExit(f"Unknown journey '{name}'. Choose from: {', '.join(DEFAULT_JOURNEYS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default='http://localhost:5000/api')
+    parser.add_argument('--profile', choices=['constant', 'ramp', 'step'], default='constant')
+    parser.add_argument('--rate', type=float, default=20, help='journeys per second (ramp: starting rate)')
+    parser.add_argument('--to-rate', type=float, default=100, help='final rate of a ramp')
+    parser.add_argument('--steps', default='10,20,40', help='comma separated rates of a step profile')
+    parser.add_argument('--duration', type=float, default=30, help='seconds')
+    parser.add_argument('--poisson', action='store_true', help='exponential inter-arrival times')
+    parser.add_argument('--journey', action='append', metavar='NAME=WEIGHT',
+                        help=f"weighted journey, repeatable (default: {DEFAULT_JOURNEYS})")
+    parser.add_argument('--processes', type=int, default=1, help='worker processes sharing the rate')
+    parser.add_argument('--threads', type=int, default=32, help='threads per worker process')
+    parser.add_argument('--interval', type=float, default=1.0, help='seconds between live reports')
+    parser.add_argument('--stock', type=int, default=1_000_000,
+                        help='stock given to every product for the run, restored afterwards')
+    parser.add_argument('--keep-stock', action='store_true', help='do not touch product stock')
+    parser.add_argument('--output', help='also write the final JSON summary to this file')
+    args = parser.parse_args(argv)
+    journey_weights = parse_journeys(args.journey)
+
+    products_api = ProductsAPI(args.base_url)
+    products = products_api.get_all_products().json()['products']
+    if not args.keep_stock:
+        for product in products:
+            products_api.update_product_stock(product['id'], args.stock)
+
+    if args.processes > 1:
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=run_worker, daemon=True,
+                                           args=(args, journey_weights, 1 / args.processes, results, seed))
+                   for seed in range(args.processes)]
+    else:
+        results = queue.Queue()
+        workers = [threading.Thread(target=run_worker, daemon=True,
+                                    args=(args, journey_weights, 1, results, 0))]
+
+    totals = ({}, Counter(), Counter())
+    scheduled_total, max_backlog = 0, 0
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+
+    # Merge the per-worker interval snapshots and print one live line per interval
+    running, interval = len(workers), ({}, Counter(), Counter())
+    interval_scheduled, reports = 0, 0
+    try:
+        while running:
+            kind, snapshot, scheduled, backlog = results.get()
+            if kind == 'done':
+                running -= 1
+                continue
+            merge(totals, snapshot)
+            merge(interval, snapshot)
+            scheduled_total += scheduled
+            interval_scheduled += scheduled
+            max_backlog = max(max_backlog, backlog)
+            reports += 1
+            if reports % len(workers) == 0:
+                journeys = summarize(interval[0], interval[1], 'journey')
+                completed = sum(journey['count'] for journey in journeys.values())
+                errors = sum(journey['errors'] for journey in journeys.values())
+                overall = LatencyHistogram()
+                for (histogram_kind, _), histogram in interval[0].items():
+                    if histogram_kind == 'journey':
+                        overall.merge(histogram)
+                print(json.dumps({
+                    'elapsed_s': round(time.perf_counter() - started, 1),
+                    'scheduled_rps': round(interval_scheduled / args.interval, 1),
+                    'completed_rps': round(completed / args.interval, 1),
+                    'error_rate': round(errors / completed, 4) if completed else 0.0,
+                    'p50_ms': round(overall.percentile(50) * 1000, 2),
+                    'p99_ms': round(overall.percentile(99) * 1000, 2),
+                    'backlog': backlog,
+                }), file=sys.stderr, flush=True)
+                interval, interval_scheduled = ({}, Counter(), Counter()), 0
+    finally:
+        for worker in workers:
+            worker.join()
+        if not args.keep_stock:
+            for product in products:
+                products_api.update_product_stock(product['id'], product['stock'])
+    elapsed = time.perf_counter() - started
+
+    journeys = summarize(totals[0], totals[1], 'journey')
+    steps = summarize(totals[0], totals[1], 'step')
+    completed = sum(journey['count'] for journey in journeys.values())
+    errors = sum(journey['errors'] for journey in journeys.values())
+    requests_sent = sum(step['count'] for step in steps.values())
+    summary = {
+        'config': {
+            'base_url': args.base_url, 'profile': args.profile, 'rate': args.rate,
+            'to_rate': args.to_rate if args.profile == 'ramp' else None,
+            'steps': args.steps if args.profile == 'step' else None,
+            'duration_s': args.duration, 'poisson': args.poisson, 'journeys': journey_weights,
+            'processes': args.processes, 'threads': args.threads,
+        },
+        'elapsed_s': round(elapsed, 2),
+        'scheduled': scheduled_total,
+        'completed': completed,
+        'errors': errors,
+        'error_rate': round(errors / completed, 4) if completed else 0.0,
+        'throughput_rps': round(completed / elapsed, 2),
+        'request_throughput_rps': round(requests_sent / elapsed, 2),
+        'max_backlog': max_backlog,
+        'journeys': journeys,
+        'steps': steps,
+        'error_kinds': dict(totals[2].most_common()),
+    }
+    output = json.dumps(summary, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as report:
+            report.write(output + '\n')
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,23 @@
+import html
 import pytest
 import os
+import random
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import load_dotenv
+from faker import Faker
+from api import cassette
+from api.isolated_server import IsolatedServer
+from utils import latency, request_log
+from utils.config import Config
+from utils.db_snapshot import DatabaseSnapshot
+
+try:
+    import pytest_html
+except ImportError:
+    pytest_html = None
 
 load = load_dotenv()
 
@@ -34,6 +47,142 @@ def driver():
 def base_url():
     return os.getenv("BASE_URL", "https://www.saucedemo.com")
 
+# Under pytest-xdist (or with --isolated-server) start a private mock server on
+# a clone of the database, and point the API clients and DatabaseUtils at it
+@pytest.fixture(scope="session", autouse=True)
+def mock_api_server(request):
+    config = request.config
+    isolated = os.getenv("PYTEST_XDIST_WORKER") or config.getoption("--isolated-server")
+    replaying = config.getoption("--cassette") and config.getoption("--cassette-mode") == cassette.REPLAY
+    if not isolated or replaying:
+        yield None
+        return
+
+    server = IsolatedServer(template_db=Config.DB_PATH).start()
+    original = Config.MOCK_API_URL, Config.DB_PATH
+    Config.MOCK_API_URL, Config.DB_PATH = server.base_url, server.db_path
+    try:
+        yield server
+    finally:
+        Config.MOCK_API_URL, Config.DB_PATH = original
+        server.stop()
+
+# Golden copy of the test database as it was when the session started. Only
+# taken when a collected test resets the database (see pytest_collection_modifyitems).
+@pytest.fixture(scope="session", autouse=True)
+def database_snapshot(request, mock_api_server):
+    if not getattr(request.config, "_needs_database_snapshot", False) or not os.path.exists(Config.DB_PATH):
+        yield None
+        return
+    # A plain connection, so taking the snapshot leaves the file's journal mode alone
+    snapshot = DatabaseSnapshot(Config.DB_PATH).capture()
+    yield snapshot
+    snapshot.close()
+
+# Put the test database back to the golden copy after the test
+@pytest.fixture(scope="function")
+def restore_database(database_snapshot):
+    yield
+    if database_snapshot is not None:
+        database_snapshot.restore()
+
+def pytest_addoption(parser):
+    parser.addoption("--latency-budget", default=os.getenv("LATENCY_BUDGET"),
+                     help="fail the run when an endpoint is slower than this, in ms; "
+                          "e.g. '200' or 'GET /api/products=50,200'")
+    parser.addoption("--latency-percentile", type=float, default=95,
+                     help="percentile checked against --latency-budget (default: 95)")
+    parser.addoption("--cassette", default=os.getenv("API_CASSETTE"),
+                     help="JSONL cassette used to record or replay API exchanges")
+    parser.addoption("--cassette-mode", choices=[cassette.RECORD, cassette.REPLAY],
+                     default=os.getenv("API_CASSETTE_MODE", cassette.REPLAY),
+                     help="record exchanges against a live server, or replay them without one")
+    parser.addoption("--isolated-server", action="store_true",
+                     default=os.getenv("MOCK_SERVER_ISOLATED", "0") == "1",
+                     help="run a private mock server on a copy of the database; "
+                          "always on under pytest-xdist")
+
+# Route the API clients through the cassette when one is given
+def pytest_configure(config):
+    path = config.getoption("--cassette")
+    config._cassette = cassette.install(config.getoption("--cassette-mode"), path) if path else None
+
+def pytest_unconfigure(config):
+    if getattr(config, "_cassette", None):
+        cassette.uninstall(config._cassette)
+
+# Remember whether any test will reset the database, so runs without one skip the snapshot
+def pytest_collection_modifyitems(config, items):
+    config._needs_database_snapshot = any("restore_database" in getattr(item, "fixturenames", ())
+                                          for item in items)
+
+# Under pytest-xdist, add each worker's latency histograms to the controller's as
+# the worker finishes, so the budget check and the table cover every test
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    exported = getattr(node, "workeroutput", {}).get("latency")
+    if exported:
+        latency.merge_exported(exported)
+
+# Fail the run when an endpoint exceeds its latency budget. An xdist worker hands
+# its histograms to the controller instead, which checks the budget for the whole run.
+def pytest_sessionfinish(session, exitstatus):
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        workeroutput["latency"] = latency.export()
+        return
+    budget = session.config.getoption("--latency-budget")
+    if not budget:
+        return
+    percentile = session.config.getoption("--latency-percentile")
+    session.config._latency_violations = latency.over_budget(budget, percentile)
+    if session.config._latency_violations and exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+# Print the per-endpoint latency percentiles after the test results
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    active_cassette = getattr(config, "_cassette", None)
+    if active_cassette and active_cassette.misses:
+        terminalreporter.section("Cassette replay misses")
+        for method, url, digest in active_cassette.misses:
+            terminalreporter.write_line(f"{method} {url} (body sha1 {digest or '<empty>'})", red=True)
+
+    rows = latency.summary()
+    if not rows:
+        return
+    terminalreporter.section("API latency")
+    terminalreporter.write_line(latency.format_table(rows))
+    percentile = config.getoption("--latency-percentile")
+    for row in getattr(config, "_latency_violations", []):
+        terminalreporter.write_line(
+            f"Latency budget exceeded: {row['endpoint']} p{percentile:g} "
+            f"{row['latency']:.2f} ms > {row['budget']:g} ms", red=True)
+
+# Add the latency table to the pytest-html summary
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix):
+    rows = latency.summary()
+    if not rows:
+        return
+    cells = "".join(
+        f"<tr><td>{html.escape(row['endpoint'])}</td><td>{row['count']}</td><td>{row['p50']:.2f}</td>"
+        f"<td>{row['p95']:.2f}</td><td>{row['p99']:.2f}</td><td>{row['max']:.2f}</td></tr>"
+        for row in rows)
+    prefix.append(
+        "<h2>API latency</h2><table><tr><th>Endpoint</th><th>Count</th><th>p50 ms</th>"
+        f"<th>p95 ms</th><th>p99 ms</th><th>Max ms</th></tr>{cells}</table>")
+
+# Start every test with an empty API exchange buffer. With a cassette, seed the
+# test data generators from it per test so recorded request bodies are reproduced on replay.
+def pytest_runtest_setup(item):
+    request_log.clear()
+    if item.config._cassette:
+        if item.get_closest_marker("live") and item.config.getoption("--cassette-mode") == cassette.REPLAY:
+            pytest.skip("needs a live HTTP transport")
+        seed = f"{item.config._cassette.seed}:{item.nodeid}"
+        random.seed(seed)
+        Faker.seed(seed)
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     """
@@ -50,10 +199,22 @@ def pytest_runtest_makereport(item, call):
     This hook is marked with `tryfirst=True` to ensure it runs before other hooks. This
     allows the hook to capture any exceptions that occur during teardown, which would
     otherwise be lost if another hook were to run first.
+
+    Failed tests also get the API exchanges buffered by utils.request_log attached,
+    both as a report section and, when pytest-html is installed, as an HTML extra.
     """
     outcome = yield
     rep = outcome.get_result()
 
+    # Attach the recent API exchanges to failed tests only
+    if rep.failed and request_log.size():
+        api_log = request_log.dump()
+        rep.sections.append(("API exchanges", api_log))
+        if pytest_html:
+            extras = getattr(rep, "extras", [])
+            extras.append(pytest_html.extras.text(api_log, name="API exchanges"))
+            rep.extras = extras
+
     if rep.when == "call" and rep.failed:
         try:
             driver = item.funcargs["driver"]
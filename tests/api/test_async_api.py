@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from api.async_base_api import AsyncConnectionPool
+from api.endpoints.orders_api import AsyncOrdersAPI
+from api.endpoints.products_api import AsyncProductsAPI
+from api.endpoints.users_api import AsyncUsersAPI
+
+class TestAsyncAPI:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.pool = AsyncConnectionPool(limit=20)
+        self.users_api = AsyncUsersAPI(pool=self.pool)
+        self.products_api = AsyncProductsAPI(pool=self.pool)
+        self.orders_api = AsyncOrdersAPI(pool=self.pool)
+
+    def run(self, coroutine):
+        async def run_and_close():
+            try:
+                return await coroutine
+            finally:
+                await self.pool.close()
+        return asyncio.run(run_and_close())
+
+    # Many user creations in flight at once all succeed
+    @pytest.mark.api
+    @pytest.mark.live
+    def test_create_users_concurrently(self):
+        async def create_users():
+            return await asyncio.gather(*(self.users_api.create_valid_user() for _ in range(20)))
+
+        results = self.run(create_users())
+
+        for response, user_data in results:
+            self.users_api.validate_status_code(response, 201)
+            json_data = self.users_api.validate_json_schema(response, ["id", "username", "email"])
+            assert json_data['username'] == user_data['username'], \
+                "Username is not correct"
+        assert len({response.json()['id'] for response, _ in results}) == 20, \
+            "Concurrent users did not get distinct IDs"
+
+    # The validators behave the same as on the sync client
+    @pytest.mark.api
+    @pytest.mark.live
+    def test_validators_match_sync_client(self):
+        response = self.run(self.users_api.get_user_by_id(99999))
+
+        self.users_api.validate_status_code(response, 404)
+        with pytest.raises(AssertionError):
+            self.users_api.validate_status_code(response, 200)
+        with pytest.raises(AssertionError):
+            self.users_api.validate_json_schema(response, ["id"])
+
+    # Order a product and read the order back
+    @pytest.mark.api
+    @pytest.mark.live
+    @pytest.mark.integration
+    def test_create_and_get_order(self):
+        async def order_flow():
+            user_response, _ = await self.users_api.create_valid_user()
+            product = await self.products_api.get_product_by_id(1)
+            order_response = await self.orders_api.create_simple_order(user_response.json()['id'])
+            fetched = await self.orders_api.get_order_by_id(order_response.json()['order_id'])
+            return product, order_response, fetched
+
+        product, order_response, fetched = self.run(order_flow())
+
+        assert product['id'] == 1, "Product ID is not correct"
+        self.orders_api.validate_status_code(order_response, 201)
+        self.orders_api.validate_status_code(fetched, 200)
+        json_data = self.orders_api.validate_json_schema(fetched, ["order_id", "user_id", "items"])
+        assert json_data['order_id'] == order_response.json()['order_id'], "Order ID is not correct"
+
+    # Resending an async order with the same Idempotency-Key replays the first response
+    @pytest.mark.api
+    @pytest.mark.live
+    @pytest.mark.integration
+    def test_create_order_is_idempotent(self):
+        async def order_twice():
+            user_response, _ = await self.users_api.create_valid_user()
+            user_id = user_response.json()['id']
+            order_data = {"user_id": user_id, "items": [{"product_id": 2, "quantity": 1}]}
+            first = await self.orders_api.create_order(order_data, idempotency_key=f"async-{user_id}")
+            replay = await self.orders_api.create_order(order_data, idempotency_key=f"async-{user_id}")
+            return first, replay
+
+        first, replay = self.run(order_twice())
+
+        self.orders_api.validate_status_code(first, 201)
+        self.orders_api.validate_status_code(replay, 201)
+        assert replay.json() == first.json(), "Replayed response should match the original"
+        assert replay.headers.get('Idempotent-Replayed') == 'true'
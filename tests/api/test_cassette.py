@@ -0,0 +1,83 @@
+import uuid
+
+import pytest
+import requests
+from api.cassette import Cassette, CassetteMiss, RecordingAdapter, ReplayAdapter
+from api.endpoints.products_api import ProductsAPI
+from api.endpoints.users_api import UsersAPI
+from utils import latency
+
+class TestCassette:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.path = str(tmp_path / "cassette.jsonl")
+
+    # Point an API client at its own session using the given adapter
+    def client(self, api_class, adapter):
+        api = api_class()
+        api.session = requests.Session()
+        api.session.headers.update({'Content-Type': 'application/json', 'Accept': 'application/json'})
+        api.session.mount("http://", adapter)
+        return api
+
+    # Exchanges recorded against the server are replayed in order without it
+    @pytest.mark.api
+    @pytest.mark.live
+    def test_record_then_replay(self):
+        recorder = Cassette(self.path)
+        products_api = self.client(ProductsAPI, RecordingAdapter(recorder))
+        users_api = self.client(UsersAPI, RecordingAdapter(recorder))
+        # The test_ prefix lets the test-data cleanup remove the user again
+        username = f"test_cassette_{uuid.uuid4().hex[:8]}"
+        original_stock = products_api.get_product(2).json()['stock']
+        products_api.update_product_stock(2, original_stock + 1)
+        recorded = [products_api.get_product(2).json(),
+                    users_api.create_user({"username": username, "email": f"{username}@example.com",
+                                           "first_name": "Cas", "last_name": "Sette"}),
+                    users_api.get_all_users(limit=2).json()]
+        products_api.update_product_stock(2, original_stock)
+        recorder.close()
+        assert recorded[1].status_code == 201
+
+        player = Cassette(self.path).load()
+        products_api = self.client(ProductsAPI, ReplayAdapter(player))
+        users_api = self.client(UsersAPI, ReplayAdapter(player))
+
+        assert products_api.get_product(2).json()['stock'] == original_stock
+        products_api.update_product_stock(2, original_stock + 1)
+        assert products_api.get_product(2).json() == recorded[0]
+        # Key order in the body does not change the match
+        response = users_api.create_user({"last_name": "Sette", "first_name": "Cas",
+                                          "email": f"{username}@example.com", "username": username})
+        assert (response.status_code, response.json()) == (recorded[1].status_code, recorded[1].json())
+        assert users_api.get_all_users(limit=2).json() == recorded[2]
+        assert player.misses == []
+
+    # A request that was never recorded fails with a message naming it
+    @pytest.mark.api
+    def test_replay_miss_is_reported(self):
+        open(self.path, "w").close()
+        player = Cassette(self.path).load()
+        users_api = self.client(UsersAPI, ReplayAdapter(player))
+
+        with pytest.raises(CassetteMiss, match=r"No recorded response for GET /api/users/7 "):
+            users_api.get_user_by_id(7)
+        assert player.misses == [("GET", "/api/users/7", "")]
+
+    # Replayed responses are kept out of the latency histograms
+    @pytest.mark.api
+    def test_replay_is_not_timed(self):
+        with open(self.path, "w") as f:
+            f.write('{"method": "GET", "url": "/api/products/9", "body_sha1": "", "status": 200, '
+                    '"reason": "OK", "headers": {"Content-Type": "application/json"}, "body": "{}"}\n')
+        player = Cassette(self.path).load()
+        products_api = self.client(ProductsAPI, ReplayAdapter(player))
+
+        def count():
+            return sum(row['count'] for row in latency.summary() if row['endpoint'] == "GET /api/products/<id>")
+        before = count()
+        response = products_api.get_product(9)
+
+        assert response.status_code == 200
+        assert count() == before, "A replayed response should not be recorded as a latency sample"
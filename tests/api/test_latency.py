@@ -0,0 +1,79 @@
+import random
+
+import pytest
+from api.endpoints.products_api import ProductsAPI
+from utils import latency
+from utils.latency import LatencyHistogram, normalize_route
+
+class TestLatency:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.products_api = ProductsAPI()
+
+    # Resource IDs collapse into one route template
+    @pytest.mark.api
+    @pytest.mark.parametrize("url,route", [
+        ("http://localhost:5000/api/orders/041f11c0-b171-4aa3-947f-53bd2a9d4a72", "/api/orders/<id>"),
+        ("http://localhost:5000/api/orders/non-existent-order-id", "/api/orders/<id>"),
+        ("http://localhost:5000/api/orders/abc", "/api/orders/<id>"),
+        ("http://localhost:5000/api/users/42/orders?after=3", "/api/users/<id>/orders"),
+        ("http://localhost:5000/api/products/7/stock", "/api/products/<id>/stock"),
+        ("http://localhost:5000/api/orders/bulk", "/api/orders/bulk"),
+        ("http://localhost:5000/api/products", "/api/products"),
+    ])
+    def test_routes_are_normalized(self, url, route):
+        assert normalize_route(url) == route
+
+    # Percentiles stay within the bucket precision without keeping every sample
+    @pytest.mark.api
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        samples = sorted(random.uniform(0.001, 0.5) for _ in range(20000))
+        for sample in samples:
+            histogram.record(sample)
+
+        for percentile in (50, 95, 99):
+            exact = samples[int(len(samples) * percentile / 100) - 1]
+            assert histogram.percentile(percentile) == pytest.approx(exact, rel=0.03)
+        assert histogram.max == samples[-1]
+        assert len(histogram.buckets) < 500, "Histogram should not grow with the sample count"
+
+    # Calls made through the API clients are recorded per route
+    @pytest.mark.api
+    def test_calls_are_recorded(self):
+        def product_row():
+            return next((row for row in latency.summary()
+                         if row['endpoint'] == "GET /api/products/<id>"), {'count': 0})
+        count_before = product_row()['count']
+
+        responses = [self.products_api.get_product(product_id) for product_id in (1, 2, 3)]
+        if any(getattr(response, 'replayed', False) for response in responses):
+            pytest.skip("responses replayed from a cassette are not timed")
+
+        row = product_row()
+        assert row['count'] == count_before + 3
+        assert 0 < row['p50'] <= row['p95'] <= row['p99'] <= row['max']
+        assert latency.over_budget("GET /api/products/<id>=0") and not latency.over_budget("60000")
+
+    # Histograms exported by another process (an xdist worker) merge into this one's
+    @pytest.mark.api
+    def test_exported_histograms_merge(self):
+        saved = latency.export()
+        latency.reset()
+        try:
+            for seconds in (0.01, 0.02, 0.03):
+                latency.record("GET", "http://localhost:5000/api/products", seconds)
+            worker = latency.export()
+
+            latency.merge_exported(worker)
+            latency.merge_exported({"GET /api/users": LatencyHistogram.from_dict(
+                worker["GET /api/products"]).to_dict()})
+
+            rows = {row['endpoint']: row for row in latency.summary()}
+            assert rows["GET /api/products"]['count'] == 6
+            assert rows["GET /api/products"]['max'] == pytest.approx(30)
+            assert rows["GET /api/users"]['count'] == 3
+        finally:
+            latency.reset()
+            latency.merge_exported(saved)
@@ -1,5 +1,10 @@
+from datetime import timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+
 import pytest
 from api.endpoints.products_api import ProductsAPI
+from api.response_schemas import PRODUCT, PRODUCTS, STOCK_UPDATED
+from utils.db_utils import DatabaseUtils
 
 class TestProductsAPI:
 
@@ -15,16 +20,12 @@ class TestProductsAPI:
         response = self.products_api.get_all_products()
 
         self.products_api.validate_status_code(response, 200)
-        json_data = self.products_api.validate_json_schema(response, ['products'])
+        json_data = self.products_api.validate_json_schema(response, PRODUCTS)
 
         products = json_data['products']
         assert len(products) >= 6, f"Expected at least 6 products, but found {len(products)}"
 
         first_product = products[0]
-        required_fields = ['id', 'name', 'price', 'stock', 'description']
-        for field in required_fields:
-            assert field in first_product, f"JSON schema is not correct. Missing field: {field}"
-        
         assert first_product['price'] > 0, "Product price should be greater than 0"
         assert first_product['stock'] >= 0, "Product stock should be greater than or equal to 0"
 
@@ -42,8 +43,7 @@ class TestProductsAPI:
         response = self.products_api.update_product_stock(product_id, new_stock)
 
         self.products_api.validate_status_code(response, 200)
-        json_data = self.products_api.validate_json_schema(response,
-            ['message', 'new_stock'])
+        json_data = self.products_api.validate_json_schema(response, STOCK_UPDATED)
         
         assert json_data['new_stock'] == new_stock
         assert 'successfully' in json_data['message']
@@ -76,4 +76,104 @@ class TestProductsAPI:
         assert product is not None, f"Product with id {product_id} not found"
         assert product['name'] == expected_name, \
             f"Expected product name to be {expected_name}, but got {product['name']}"
-        assert product['id'] == product_id
\ No newline at end of file
+        assert product['id'] == product_id
+
+    # Get a single product and revalidate it with its ETag
+    @pytest.mark.api
+    def test_get_product_conditional_request(self):
+        response = self.products_api.get_product(1)
+
+        self.products_api.validate_status_code(response, 200)
+        self.products_api.validate_json_schema(response, PRODUCT)
+        etag = response.headers.get('ETag')
+        assert etag, "Product response should include an ETag"
+        assert response.headers.get('Last-Modified'), "Product response should include Last-Modified"
+
+        not_modified = self.products_api.get_product(1, etag=etag)
+        self.products_api.validate_status_code(not_modified, 304)
+
+        self.products_api.update_product_stock(1, response.json()['stock'] + 1)
+        modified = self.products_api.get_product(1, etag=etag)
+        self.products_api.validate_status_code(modified, 200)
+        assert modified.headers.get('ETag') != etag, "ETag should change when the product changes"
+
+        self.products_api.update_product_stock(1, response.json()['stock'])
+
+    # Revalidate a product with If-Modified-Since against its Last-Modified time
+    @pytest.mark.api
+    def test_get_product_if_modified_since(self):
+        response = self.products_api.get_product(1)
+        last_modified = parsedate_to_datetime(response.headers['Last-Modified'])
+
+        not_modified = self.products_api.get("/products/1", headers={
+            'If-Modified-Since': format_datetime(last_modified, usegmt=True)})
+        self.products_api.validate_status_code(not_modified, 304)
+
+        modified = self.products_api.get("/products/1", headers={
+            'If-Modified-Since': format_datetime(last_modified - timedelta(seconds=1), usegmt=True)})
+        self.products_api.validate_status_code(modified, 200)
+        assert modified.json() == response.json()
+
+    # Get a single product that does not exist
+    @pytest.mark.api
+    def test_get_product_not_found(self):
+        response = self.products_api.get_product(99999)
+
+        self.products_api.validate_status_code(response, 404)
+        assert 'not found' in response.json()['error']
+        assert self.products_api.get_product_by_id(99999) is None
+
+    # Catalog reads reflect stock updates and repeat reads are served from the cache
+    @pytest.mark.api
+    def test_get_all_products_after_stock_update(self):
+        original_stock = self.products_api.get_product_by_id(2)['stock']
+        self.products_api.update_product_stock(2, original_stock + 3)
+
+        # Enough reads that every server worker sees at least one repeat
+        responses = [self.products_api.get_all_products() for _ in range(10)]
+
+        for response in responses:
+            self.products_api.validate_status_code(response, 200)
+            product = next(p for p in response.json()['products'] if p['id'] == 2)
+            assert product['stock'] == original_stock + 3, \
+                f"Catalog should show the updated stock {original_stock + 3}, but shows {product['stock']}"
+            assert response.json() == responses[0].json()
+
+        cache_results = [response.headers.get('X-Catalog-Cache') for response in responses]
+        assert 'hit' in cache_results, f"Repeat catalog reads should hit the cache: {cache_results}"
+
+        self.products_api.update_product_stock(2, original_stock)
+
+    # Catalog reads reflect stock written straight to the database, not through the API
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_get_all_products_after_database_write(self):
+        db = DatabaseUtils()
+        original_stock = db.get_product_stock(3)
+        self.products_api.get_all_products()
+        self.products_api.get_all_products()
+
+        db.update_product_stock(3, original_stock + 7)
+        try:
+            response = self.products_api.get_all_products()
+            product = next(p for p in response.json()['products'] if p['id'] == 3)
+            assert product['stock'] == original_stock + 7, \
+                f"Catalog should show the stock written to the database, but shows {product['stock']}"
+        finally:
+            db.update_product_stock(3, original_stock)
+            db.close()
+
+    # A database reset is seen by the next catalog read, even with the catalog cached
+    @pytest.mark.api
+    @pytest.mark.integration
+    def test_get_all_products_after_database_restore(self, restore_database, database_snapshot):
+        database_snapshot.restore()
+        original = self.products_api.get_all_products().json()
+        stock = next(p['stock'] for p in original['products'] if p['id'] == 4)
+
+        self.products_api.update_product_stock(4, stock + 5)
+        self.products_api.get_all_products()
+        database_snapshot.restore()
+
+        assert self.products_api.get_all_products().json() == original, \
+            "Catalog should show the restored stock after a database reset"
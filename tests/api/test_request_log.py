@@ -0,0 +1,58 @@
+import logging
+from collections import deque
+
+import pytest
+from api.endpoints.users_api import UsersAPI
+from utils import request_log
+
+class TestRequestLog:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.users_api = UsersAPI()
+
+    # The buffer keeps only the most recent exchanges
+    @pytest.mark.api
+    def test_buffer_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(request_log, "_buffer", deque(maxlen=3))
+
+        for user_id in range(1, 6):
+            self.users_api.get_user_by_id(user_id)
+
+        assert request_log.size() == 3, "Request log buffer is not bounded"
+        api_log = request_log.dump()
+        assert "/users/5 ->" in api_log, "Latest exchange is missing from the dump"
+        assert "/users/1 ->" not in api_log, "Oldest exchange was not evicted"
+
+    # Bodies are never formatted while the logger is disabled
+    @pytest.mark.api
+    def test_disabled_logging_skips_formatting(self, monkeypatch):
+        def fail_format(*args, **kwargs):
+            raise AssertionError("Body was formatted while logging is disabled")
+
+        monkeypatch.setattr(request_log.logger, "level", logging.WARNING)
+        monkeypatch.setattr(request_log, "_format_body", fail_format)
+
+        response = self.users_api.get_all_users(limit=1)
+
+        self.users_api.validate_status_code(response, 200)
+        assert request_log.size() == 1, "Exchange was not buffered"
+
+    # Non-JSON bodies are dumped as text
+    @pytest.mark.api
+    def test_dump_handles_non_json_body(self):
+        response = self.users_api.get("/does-not-exist")
+
+        self.users_api.validate_status_code(response, 404)
+        assert f"GET {self.users_api.base_url}/does-not-exist -> 404" in request_log.dump()
+
+    # Streamed exchanges go through the client pipeline but their bodies are left to the caller
+    @pytest.mark.api
+    def test_streamed_exchange_is_logged(self):
+        users = list(self.users_api.stream_users(limit=2))
+
+        assert len(users) == 2
+        assert request_log.size() == 1, "Streamed exchange was not buffered"
+        api_log = request_log.dump()
+        assert f"GET {self.users_api.base_url}/users -> 200" in api_log
+        assert "Response: (streamed, not captured)" in api_log
@@ -0,0 +1,56 @@
+import pytest
+from api.endpoints.products_api import ProductsAPI
+from api.response_schemas import ORDER, PRODUCTS, Optional, Schema
+
+class TestResponseSchemas:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.products_api = ProductsAPI()
+
+    # Nested mismatches are reported with the path of the offending field
+    @pytest.mark.api
+    def test_nested_fields_and_types_are_checked(self):
+        order = {
+            'order_id': 'abc', 'user_id': 1, 'username': 'user', 'total_amount': 9.99,
+            'status': 'completed', 'created_at': None,
+            'items': [{'product_id': 1, 'product_name': 'Backpack', 'quantity': 1, 'price': 9.99}],
+        }
+        assert ORDER(order) is order
+
+        order['items'][0]['quantity'] = '1'
+        with pytest.raises(AssertionError, match=r"items\[0\]\.quantity: expected int, got str"):
+            ORDER(order)
+
+        del order['items'][0]['price']
+        order['items'][0]['quantity'] = 1
+        with pytest.raises(AssertionError, match=r"Missing field: items\[0\]\.price"):
+            ORDER(order)
+
+    # bool is not accepted where a number is declared
+    @pytest.mark.api
+    def test_bool_is_not_a_number(self):
+        schema = Schema({'stock': int, 'note': Optional(str)})
+        schema({'stock': 3, 'note': None})
+        with pytest.raises(AssertionError, match="stock: expected int, got bool"):
+            schema({'stock': True, 'note': None})
+
+    # The body is decoded once however many times it is validated and read
+    @pytest.mark.api
+    def test_parsed_body_is_memoized(self):
+        response = self.products_api.get_all_products()
+        self.products_api.validate_status_code(response, 200)
+
+        first = self.products_api.validate_json_schema(response, PRODUCTS)
+        assert self.products_api.validate_json_schema(response, ['products']) is first
+        assert response.json() is first
+
+    # A list of field names still works and only checks that the fields are present
+    @pytest.mark.api
+    def test_required_field_list(self):
+        response = self.products_api.get_all_products()
+
+        json_data = self.products_api.validate_json_schema(response, ['products'])
+        assert json_data['products']
+        with pytest.raises(AssertionError, match="Missing field: users"):
+            self.products_api.validate_json_schema(response, ['users'])
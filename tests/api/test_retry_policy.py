@@ -0,0 +1,88 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from api.base_api import BaseAPI
+from api.retry_policy import RetryPolicy, reset_retry_stats, retry_stats
+from utils import latency
+
+# Server that fails the first `failures` requests to each path with a 503
+class FlakyHandler(BaseHTTPRequestHandler):
+    disable_nagle_algorithm = True
+    failures = 2
+    hits = {}
+
+    def respond(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        status = 503 if self.hits[self.path] <= self.failures else 200
+        body = json.dumps({"attempt": self.hits[self.path]}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = respond
+
+    def log_message(self, format, *args):
+        pass
+
+class TestRetryPolicy:
+
+    # Calls to the local stub server stay out of the latency report and budget
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        monkeypatch.setattr(latency, "record", lambda method, url, seconds: None)
+        FlakyHandler.hits = {}
+        reset_retry_stats()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        self.api = BaseAPI(base_url=f"http://127.0.0.1:{server.server_address[1]}",
+                           retry_policy=RetryPolicy(backoff_factor=0.001))
+        yield
+        server.shutdown()
+        server.server_close()
+
+    # Idempotent methods are retried through transient errors
+    @pytest.mark.api
+    @pytest.mark.live
+    def test_get_is_retried(self):
+        response = self.api.get("/get")
+
+        self.api.validate_status_code(response, 200)
+        assert response.json()["attempt"] == 3
+        assert retry_stats() == {"retries": 2}
+
+    # POST is not retried unless it carries an Idempotency-Key
+    @pytest.mark.api
+    @pytest.mark.live
+    def test_post_needs_idempotency_key(self):
+        response = self.api.post("/plain", data={"x": 1})
+        self.api.validate_status_code(response, 503)
+
+        response = self.api.post("/keyed", data={"x": 1}, headers={"Idempotency-Key": "abc"})
+        self.api.validate_status_code(response, 200)
+        assert FlakyHandler.hits == {"/plain": 1, "/keyed": 3}
+
+    # Giving up after the retry budget returns the last response
+    @pytest.mark.api
+    @pytest.mark.live
+    def test_retries_are_bounded(self):
+        self.api.retry_policy = RetryPolicy(backoff_factor=0.001, method_retries={"GET": 1})
+
+        response = self.api.get("/bounded")
+
+        self.api.validate_status_code(response, 503)
+        assert retry_stats() == {"retries": 1, "retries_exhausted": 1}
+
+    # Backoff grows exponentially but stays within the cap
+    @pytest.mark.api
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(backoff_factor=0.1, max_backoff=0.5)
+
+        delays = [policy.backoff(retry_number) for retry_number in range(10) for _ in range(20)]
+
+        assert all(0 <= delay <= 0.5 for delay in delays)
+        assert len(set(delays)) > 1, "Backoff should be jittered"
@@ -0,0 +1,89 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from api import session_registry
+from api.base_api import BaseAPI
+from api.endpoints.orders_api import OrdersAPI
+from api.endpoints.products_api import ProductsAPI
+from api.endpoints.users_api import UsersAPI
+from api.isolated_server import IsolatedServer
+from utils import latency
+from utils.config import Config
+
+# Minimal HTTP/1.1 server that keeps connections open between requests
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestSessionRegistry:
+
+    # Calls to the stub and private servers stay out of the latency report and budget
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        monkeypatch.setattr(latency, "record", lambda method, url, seconds: None)
+        session_registry.reset_stats()
+
+    @pytest.fixture
+    def keep_alive_url(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    # Endpoint clients for the same base URL borrow one session
+    @pytest.mark.api
+    def test_clients_share_session(self):
+        users_api, products_api, orders_api = UsersAPI(), ProductsAPI(), OrdersAPI()
+
+        assert users_api.session is products_api.session is orders_api.session, \
+            "Endpoint clients did not share the session"
+        assert UsersAPI(base_url="http://127.0.0.1:1/api").session is not users_api.session, \
+            "Different base URLs should not share a session"
+
+    # Requests over a keep-alive connection are counted as reused
+    @pytest.mark.api
+    @pytest.mark.live
+    def test_connection_reuse_is_counted(self, keep_alive_url):
+        api = BaseAPI(base_url=keep_alive_url)
+
+        for _ in range(10):
+            api.validate_status_code(api.get("/"), 200)
+
+        stats = session_registry.connection_stats()
+        assert stats["requests"] == 10, f"Expected 10 requests. Actual: {stats}"
+        assert stats["connections_opened"] == 1, f"Expected a single connection. Actual: {stats}"
+        assert stats["connections_reused"] == 9, f"Expected 9 reused connections. Actual: {stats}"
+
+    # Requests against the production mock server are all accounted for and share connections
+    @pytest.mark.api
+    @pytest.mark.live
+    def test_connection_stats_add_up(self):
+        server = IsolatedServer(template_db=Config.DB_PATH, threads=2).start()
+        try:
+            users_api = UsersAPI(base_url=server.base_url)
+            session_registry.reset_stats()
+
+            for _ in range(5):
+                users_api.get_all_users(limit=1)
+        finally:
+            server.stop()
+
+        stats = session_registry.connection_stats()
+        assert stats["requests"] == 5, f"Expected 5 requests. Actual: {stats}"
+        assert stats["connections_opened"] + stats["connections_reused"] == 5, \
+            f"Opened and reused connections do not add up. Actual: {stats}"
+        assert stats["connections_reused"] >= 1, f"Expected the server to keep connections open. Actual: {stats}"
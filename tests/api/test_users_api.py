@@ -1,5 +1,6 @@
 import pytest
 from api.endpoints.users_api import UsersAPI
+from api.response_schemas import USER, USER_CREATED, USERS_PAGE
 from utils.helpers import TestHelpers
 
 class TestUsersAPI:
@@ -14,10 +15,7 @@ class TestUsersAPI:
         response = self.users_api.get_all_users()
 
         self.users_api.validate_status_code(response, 200)
-        json_data = self.users_api.validate_json_schema(response, ["users"])
-
-        assert isinstance(json_data['users'], list), \
-            "JSON schema is not correct. 'users' field is not a list"
+        self.users_api.validate_json_schema(response, USERS_PAGE)
         
     # Create user
     @pytest.mark.api
@@ -29,8 +27,7 @@ class TestUsersAPI:
         response = self.users_api.create_user(user_data)
 
         self.users_api.validate_status_code(response, 201)
-        json_data = self.users_api.validate_json_schema(response, 
-            ["id", "username", "email", "first_name", "last_name", "message"])
+        json_data = self.users_api.validate_json_schema(response, USER_CREATED)
         
         assert json_data['username'] == user_data['username']
         assert json_data['email'] == user_data['email']
@@ -65,8 +62,7 @@ class TestUsersAPI:
         response = self.users_api.get_user_by_id(user_id)
         
         self.users_api.validate_status_code(response, 200)
-        json_data = self.users_api.validate_json_schema(response, 
-            ['id', 'username', 'email', 'first_name', 'last_name'])
+        json_data = self.users_api.validate_json_schema(response, USER)
         
         assert json_data['id'] == user_id
         assert json_data['username'] == user_data['username']
@@ -80,4 +76,97 @@ class TestUsersAPI:
         self.users_api.validate_status_code(response, 404)
         json_data = response.json()
         assert 'error' in json_data
-        assert 'User not found' in json_data['error']
\ No newline at end of file
+        assert 'User not found' in json_data['error']
+
+    # Get users page by page with the keyset cursor
+    @pytest.mark.api
+    def test_get_users_pagination(self):
+        created_ids = [self.users_api.create_valid_user()[0].json()['id'] for _ in range(3)]
+
+        response = self.users_api.get_all_users(after_id=created_ids[0] - 1, limit=2)
+
+        self.users_api.validate_status_code(response, 200)
+        json_data = self.users_api.validate_json_schema(response, USERS_PAGE)
+        assert [user['id'] for user in json_data['users']] == created_ids[:2]
+        assert json_data['next_after_id'] == created_ids[1]
+
+        paged_ids = [user['id'] for user in self.users_api.iter_users(page_size=2, after_id=created_ids[0] - 1)]
+        assert paged_ids[:3] == created_ids
+        assert paged_ids == sorted(paged_ids), "Users should be returned in ID order"
+
+    # Invalid page size
+    @pytest.mark.api
+    def test_get_users_invalid_limit(self):
+        response = self.users_api.get_all_users(limit=0)
+
+        self.users_api.validate_status_code(response, 400)
+        assert 'limit' in response.json()['error']
+
+    # Stream users as NDJSON
+    @pytest.mark.api
+    def test_stream_users_ndjson(self):
+        created_ids = [self.users_api.create_valid_user()[0].json()['id'] for _ in range(2)]
+
+        streamed = list(self.users_api.stream_users(after_id=created_ids[0] - 1))
+
+        assert [user['id'] for user in streamed][:2] == created_ids
+        for field in ['id', 'username', 'email', 'first_name', 'last_name', 'created_at']:
+            assert field in streamed[0], f"JSON schema is not correct. Missing field: {field}"
+
+    # Create users in bulk with per-row conflict results
+    @pytest.mark.api
+    @pytest.mark.regression
+    def test_create_users_bulk(self):
+        users = [TestHelpers.generate_test_user() for _ in range(5)]
+        duplicate = dict(users[0], username=users[0]['username'] + '_dup')
+        incomplete = {'username': 'missing_fields'}
+
+        result = self.users_api.create_many(users + [duplicate, incomplete], chunk_size=3)
+
+        assert result['created'] == 5
+        assert result['failed'] == 2
+        statuses = [row['status_code'] for row in result['results']]
+        assert statuses == [201] * 5 + [409, 400]
+        assert [row['index'] for row in result['results']] == list(range(7))
+        assert 'already exists' in result['results'][5]['error']
+
+        created = self.users_api.get_user_by_id(result['results'][4]['id']).json()
+        assert created['username'] == users[4]['username']
+
+    # Rows with malformed fields are rejected one by one without failing their chunk
+    @pytest.mark.api
+    @pytest.mark.regression
+    def test_create_users_bulk_invalid_fields(self):
+        user = TestHelpers.generate_test_user()
+        bad_username = dict(TestHelpers.generate_test_user(), username={'x': 1})
+        null_email = dict(TestHelpers.generate_test_user(), email=None)
+
+        result = self.users_api.create_many([user, bad_username, null_email])
+
+        assert [row['status_code'] for row in result['results']] == [201, 400, 400]
+        assert result['results'][1]['error'] == 'username must be a non-empty string'
+        assert result['results'][2]['error'] == 'email must be a non-empty string'
+        created = self.users_api.get_user_by_id(result['results'][0]['id']).json()
+        assert created['username'] == user['username']
+
+    # Create users in parallel, keeping the results in input order
+    @pytest.mark.api
+    def test_create_users_concurrently(self):
+        result = self.users_api.create_users_concurrently(10, max_workers=4)
+
+        assert result['created'] == 10 and result['failed'] == 0, result['results']
+        assert [item['index'] for item in result['results']] == list(range(10))
+        for item in result['results']:
+            assert item['error'] is None
+            assert item['response'].json()['username'] == item['user_data']['username'], \
+                "Results are not in input order"
+
+    # Errors are collected per item without stopping the batch
+    @pytest.mark.api
+    def test_fan_out_collects_errors(self):
+        outcomes = self.users_api.fan_out(lambda user_id: self.users_api.get_user_by_id(100 // user_id),
+                                          [1, 0, 2], max_workers=3)
+
+        assert outcomes[0][0].status_code in (200, 404) and outcomes[0][1] is None
+        assert outcomes[1][0] is None and isinstance(outcomes[1][1], ZeroDivisionError)
+        assert outcomes[2][0].url.endswith('/users/50')
@@ -0,0 +1,91 @@
+import http.client
+import threading
+
+import pytest
+from api.wsgi_server import ThreadPoolWSGIServer
+
+# WSGI app that answers with the request path and never reads the request body
+def echo_path(environ, start_response):
+    body = environ["PATH_INFO"].encode()
+    start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", str(len(body)))])
+    return [body]
+
+# WSGI app that streams its body without a Content-Length
+def streamed(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return iter([b"one,", b"two"])
+
+class TestWSGIServer:
+
+    def start(self, app, threads=2):
+        server = ThreadPoolWSGIServer("127.0.0.1", 0, app, threads=threads)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        self.servers.append((server, thread))
+        return http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.servers = []
+        yield
+        for server, thread in self.servers:
+            server.shutdown()
+            server.drain()
+            server.server_close()
+            thread.join()
+
+    # Several requests share one connection, including ones whose body the app ignored
+    @pytest.mark.api
+    def test_connection_is_kept_alive(self):
+        conn = self.start(echo_path)
+
+        responses = []
+        for path, body in (("/first", None), ("/second", b"x" * 10000), ("/third", None)):
+            conn.request("POST" if body else "GET", path, body=body)
+            response = conn.getresponse()
+            responses.append((response.status, response.read(), response.getheader("Connection")))
+            assert conn.sock is not None, f"Server closed the connection after {path}"
+
+        assert responses == [(200, b"/first", None), (200, b"/second", None), (200, b"/third", None)]
+        conn.close()
+
+    # Bodies without a Content-Length are sent chunked so the connection stays usable
+    @pytest.mark.api
+    def test_streamed_response_is_chunked(self):
+        conn = self.start(streamed)
+
+        for _ in range(2):
+            conn.request("GET", "/")
+            response = conn.getresponse()
+            assert response.getheader("Transfer-Encoding") == "chunked"
+            assert response.read() == b"one,two"
+        assert conn.sock is not None, "Server closed a chunked connection"
+        conn.close()
+
+    # A client that asks for it gets its connection closed
+    @pytest.mark.api
+    def test_connection_close_is_honoured(self):
+        conn = self.start(echo_path)
+
+        conn.request("GET", "/bye", headers={"Connection": "close"})
+        response = conn.getresponse()
+
+        assert response.getheader("Connection") == "close"
+        assert response.read() == b"/bye"
+        assert response.will_close
+
+    # Draining closes idle kept-alive connections instead of waiting for them to time out
+    @pytest.mark.api
+    def test_drain_closes_idle_connections(self):
+        conn = self.start(echo_path)
+        conn.request("GET", "/idle")
+        conn.getresponse().read()
+        server, thread = self.servers.pop()
+
+        server.shutdown()
+        server.drain()
+        server.server_close()
+        thread.join()
+
+        assert conn.sock.recv(1) == b"", "Idle connection should have been closed by drain()"
+        conn.close()
@@ -0,0 +1,25 @@
+import pytest
+from utils.db_utils import DatabaseUtils
+from utils.schema import migrate
+
+# Fresh database files in the test's tmp_path. Each call returns a DatabaseUtils
+# on a new, fully migrated file, seeded with utils/seeder.py when counts are
+# given (e.g. fresh_db(users=20, products=5, orders=30, seed=5)); every
+# database is closed after the test.
+@pytest.fixture
+def fresh_db(tmp_path):
+    databases = []
+
+    def make(**seed):
+        db = DatabaseUtils(str(tmp_path / f"test_{len(databases)}.db"))
+        databases.append(db)
+        if seed:
+            db.seed(**seed)
+        else:
+            with db.get_connection() as conn:
+                migrate(conn)
+        return db
+
+    yield make
+    for db in databases:
+        db.close()
@@ -0,0 +1,59 @@
+import pytest
+from utils.db_utils import DatabaseUtils
+from utils.rows import Order, OrderDetails, OrderItemDetails, Product, User, to_dict
+
+class TestDatabaseRows:
+
+    # Seed a fresh database for each test
+    @pytest.fixture(autouse=True)
+    def setup(self, fresh_db):
+        self.db = fresh_db(users=20, products=5, orders=30, seed=5)
+        self.order_id = self.db.execute_query('SELECT id FROM orders ORDER BY id LIMIT 1')[0][0]
+
+    # Verify that the lookup helpers return typed rows that still index like tuples
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_helpers_return_typed_rows(self):
+        user = self.db.get_user_by_username('seed1')
+        assert isinstance(user, User)
+        assert user.username == user[1] == 'seed1'
+        assert not hasattr(user, '__dict__'), "Rows should not carry a per-row __dict__"
+
+        product = self.db.get_product(1)
+        assert isinstance(product, Product)
+        assert product.stock == self.db.get_product_stock(1)
+
+        order = self.db.get_order_details(self.order_id)
+        assert isinstance(order, OrderDetails)
+        assert order.username == self.db.execute_query(
+            'SELECT username FROM users WHERE id = ?', (order.user_id,))[0][0]
+        assert all(isinstance(row, Order) for row in self.db.get_orders_by_user(order.user_id))
+
+        items = self.db.get_order_items(self.order_id)
+        assert items and all(isinstance(item, OrderItemDetails) for item in items)
+        assert sum(item.quantity * item.price for item in items) == pytest.approx(order.total_amount, abs=0.01)
+
+    # Verify that the lightweight mode and execute_query return plain tuples
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_plain_tuple_mode(self):
+        db = DatabaseUtils(self.db.db_path, typed_rows=False)
+        user = db.get_user_by_username('seed1')
+        assert type(user) is tuple
+        assert user == tuple(self.db.get_user_by_username('seed1'))
+        db.close()
+
+        rows = self.db.execute_query('SELECT * FROM users ORDER BY id')
+        assert len(rows) == 20 and all(type(row) is tuple for row in rows)
+        typed = self.db.execute_query('SELECT * FROM users ORDER BY id', row_type=User)
+        assert typed == rows
+
+    # Verify that rows map to the JSON field names used by the API
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_rows_convert_to_dicts(self):
+        product = self.db.get_product(1)
+
+        assert to_dict(Product, product) == {'id': 1, 'name': product.name, 'price': product.price,
+                                             'stock': product.stock, 'description': 'Seeded product'}
+        assert to_dict(Product, tuple(product)) == product._asdict()
@@ -0,0 +1,63 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+from utils.schema import SCHEMA_VERSION, get_schema_version, migrate
+
+class TestDatabaseSchema:
+
+    # Build a fresh, fully migrated database for each test
+    @pytest.fixture(autouse=True)
+    def setup(self, fresh_db):
+        self.db = fresh_db()
+
+    # Get the EXPLAIN QUERY PLAN details for a query
+    def query_plan(self, query, params=()):
+        return [row[3] for row in self.db.execute_query(f"EXPLAIN QUERY PLAN {query}", params)]
+
+    # Verify that migrations run in order and are recorded in user_version
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_migrations_are_versioned(self, tmp_path):
+        with closing(sqlite3.connect(str(tmp_path / "unmigrated.db"))) as conn:
+            assert migrate(conn) == list(range(1, SCHEMA_VERSION + 1))
+            assert get_schema_version(conn) == SCHEMA_VERSION
+            assert migrate(conn) == [], "Running the migrations again should be a no-op"
+
+    # Verify that the hot lookups are served by indexes instead of full scans
+    @pytest.mark.db
+    @pytest.mark.integration
+    @pytest.mark.parametrize("query,params,index", [
+        ('SELECT * FROM orders WHERE user_id = ?', (1,), 'idx_orders_user_id'),
+        ('SELECT COUNT(*) FROM order_items WHERE order_id = ?', ('order',), 'idx_order_items_order_id'),
+        ('''
+            SELECT oi.*, p.name
+            FROM order_items oi
+            JOIN products p ON oi.product_id = p.id
+            WHERE oi.order_id = ?
+        ''', ('order',), 'idx_order_items_order_id'),
+    ])
+    def test_hot_queries_use_indexes(self, query, params, index):
+        plan = self.query_plan(query, params)
+
+        assert any(index in detail for detail in plan), \
+            f"Query should use {index}. Plan: {plan}"
+        assert not any(detail.startswith('SCAN') for detail in plan), \
+            f"Query should not scan a whole table. Plan: {plan}"
+
+    # Verify that every write to a product moves its modification time forward
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_product_writes_update_modified_time(self):
+        def modified_at():
+            return self.db.execute_query('SELECT modified_at FROM product_modified WHERE product_id = 1')
+
+        self.db.execute_update("INSERT INTO products (id, name, price, stock) VALUES (1, 'Backpack', 29.99, 10)")
+        assert modified_at()[0][0] > 0
+
+        self.db.execute_update('UPDATE product_modified SET modified_at = 0')
+        self.db.execute_update('UPDATE products SET stock = 9 WHERE id = 1')
+        assert modified_at()[0][0] > 0, "An update should record a new modification time"
+
+        self.db.execute_update('DELETE FROM products WHERE id = 1')
+        assert modified_at() == []
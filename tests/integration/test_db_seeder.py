@@ -0,0 +1,60 @@
+import pytest
+from utils.db_utils import DatabaseUtils, main
+from utils.schema import secondary_indexes
+
+class TestDatabaseSeeder:
+
+    # Seed a fresh database for each test
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, fresh_db):
+        self.tmp_path = tmp_path
+        self.db = fresh_db()
+        self.report = self.db.seed(users=500, products=20, orders=1000, items_per_order=3, seed=42)
+
+    # Verify the row counts and that every reference points at an existing row
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_rows_are_consistent(self):
+        assert self.db.get_user_count() == 500
+        assert self.db.execute_query('SELECT COUNT(*) FROM orders')[0][0] == self.report['orders'] > 900
+        assert self.db.execute_query('SELECT COUNT(*) FROM order_items')[0][0] == self.report['order_items']
+        assert self.report['rows_per_sec'] > 0
+
+        orphans = self.db.execute_query('''
+            SELECT
+                (SELECT COUNT(*) FROM orders o LEFT JOIN users u ON u.id = o.user_id WHERE u.id IS NULL),
+                (SELECT COUNT(*) FROM order_items oi LEFT JOIN orders o ON o.id = oi.order_id WHERE o.id IS NULL),
+                (SELECT COUNT(*) FROM order_items oi LEFT JOIN products p ON p.id = oi.product_id WHERE p.id IS NULL)
+        ''')[0]
+        assert orphans == (0, 0, 0)
+
+        mismatched_totals = self.db.execute_query('''
+            SELECT COUNT(*) FROM orders o
+            WHERE ABS(o.total_amount - (SELECT SUM(quantity * price) FROM order_items WHERE order_id = o.id)) > 0.01
+        ''')[0][0]
+        assert mismatched_totals == 0
+
+    # Verify that stock reflects the order history and never goes negative
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_stock_matches_order_history(self):
+        sold = self.db.execute_query('SELECT SUM(quantity) FROM order_items')[0][0]
+        assert sold == self.report['units_sold']
+        assert self.db.execute_query('SELECT MIN(stock) FROM products')[0][0] >= 0
+
+    # Verify that the same seed produces the same rows and the indexes are rebuilt
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_seed_is_reproducible(self):
+        other = DatabaseUtils(str(self.tmp_path / "seed_again.db"))
+        main(['seed', '--db', other.db_path, '--users', '500', '--products', '20',
+              '--orders', '1k', '--items-per-order', '3', '--seed', '42'])
+
+        for query in ('SELECT * FROM users ORDER BY id', 'SELECT * FROM products ORDER BY id',
+                      'SELECT * FROM orders ORDER BY id', 'SELECT * FROM order_items ORDER BY id'):
+            assert other.execute_query(query) == self.db.execute_query(query), query
+
+        with self.db.get_connection() as conn:
+            names = [name for name, _ in secondary_indexes(conn)]
+        assert names == ['idx_order_items_order_id', 'idx_orders_user_id']
+        other.close()
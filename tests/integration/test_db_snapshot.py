@@ -0,0 +1,70 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+class TestDatabaseSnapshot:
+
+    # Seed a fresh database for each test
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, fresh_db):
+        self.tmp_path = tmp_path
+        self.db = fresh_db(users=200, products=10, orders=300, seed=1)
+
+    def contents(self, db):
+        return [db.execute_query(f'SELECT * FROM {table} ORDER BY id')
+                for table in ('users', 'products', 'orders', 'order_items')]
+
+    # Change the database the way a test would
+    def write_test_data(self):
+        with self.db.transaction():
+            self.db.execute_update("INSERT INTO users (username, email, first_name, last_name) "
+                                   "VALUES ('testsnap', 'testsnap@example.com', 'Test', 'Snap')")
+            self.db.execute_update('UPDATE products SET stock = 0')
+            self.db.execute_update('DELETE FROM order_items WHERE id % 2 = 0')
+
+    # Verify that a restore undoes every write, from memory and from a file copy
+    @pytest.mark.db
+    @pytest.mark.integration
+    @pytest.mark.parametrize("in_memory", [True, False])
+    def test_restore_undoes_writes(self, in_memory):
+        golden = self.contents(self.db)
+        snapshot = self.db.snapshot(location=None if in_memory else str(self.tmp_path))
+        assert (snapshot.path is None) == in_memory
+
+        self.write_test_data()
+        assert self.contents(self.db) != golden
+
+        assert self.db.restore(snapshot) >= 0
+        assert self.contents(self.db) == golden
+        assert not self.db.user_exists('testsnap')
+
+        snapshot.close()
+        assert list(self.tmp_path.glob('snapshot-*')) == []
+
+    # Verify that connections held open elsewhere see the restored data
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_open_connections_see_restored_data(self):
+        snapshot = self.db.snapshot(location=None)
+        with closing(sqlite3.connect(self.db.db_path)) as other:
+            stock = other.execute('SELECT SUM(stock) FROM products').fetchone()[0]
+            self.write_test_data()
+            assert other.execute('SELECT SUM(stock) FROM products').fetchone()[0] == 0
+
+            snapshot.restore()
+            assert other.execute('SELECT SUM(stock) FROM products').fetchone()[0] == stock
+            assert other.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+        snapshot.close()
+
+    # Verify that a restore moves product modification times forward, never back
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_restore_moves_modified_times_forward(self):
+        self.db.execute_update('UPDATE product_modified SET modified_at = 0')
+        snapshot = self.db.snapshot(location=None)
+
+        snapshot.restore()
+
+        assert self.db.execute_query('SELECT MIN(modified_at) FROM product_modified')[0][0] > 0
+        snapshot.close()
@@ -0,0 +1,91 @@
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import pytest
+from utils.db_utils import DatabaseUtils
+
+class TestDatabaseUtils:
+
+    # Build a fresh, fully migrated database for each test
+    @pytest.fixture(autouse=True)
+    def setup(self, fresh_db):
+        self.db = fresh_db()
+        self.db_path = self.db.db_path
+        self.db.execute_update("INSERT INTO products (id, name, price, stock) VALUES (1, 'Backpack', 29.99, 10)")
+
+    # Verify that a thread keeps using one connection while other threads get their own
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_connection_is_reused_per_thread(self):
+        with self.db.get_connection() as first:
+            pass
+        self.db.get_product_stock(1)
+        with self.db.get_connection() as second:
+            assert second is first
+
+        other = []
+        def connect():
+            with self.db.get_connection() as conn:
+                other.append(conn)
+        thread = threading.Thread(target=connect)
+        thread.start()
+        thread.join()
+        assert other[0] is not first
+
+        assert self.db.execute_query('PRAGMA journal_mode')[0][0] == 'wal'
+
+    # Verify that turning reuse off opens a new connection every time
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_connection_per_call_mode(self):
+        db = DatabaseUtils(self.db_path, reuse_connections=False)
+        with db.get_connection() as first:
+            pass
+        with db.get_connection() as second:
+            assert second is not first
+        assert db.get_product_stock(1) == 10
+
+    # Verify that writes in a transaction are committed together or not at all
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_transaction_groups_writes(self):
+        with self.db.transaction():
+            self.db.update_product_stock(1, 7)
+            self.db.execute_update("INSERT INTO users (username, email, first_name, last_name) "
+                                   "VALUES ('tx', 'tx@example.com', 'Tx', 'User')")
+        assert self.db.get_product_stock(1) == 7
+        assert self.db.user_exists('tx')
+
+        with pytest.raises(RuntimeError):
+            with self.db.transaction():
+                self.db.update_product_stock(1, 3)
+                with self.db.transaction():
+                    self.db.execute_update('DELETE FROM users')
+                raise RuntimeError("abort")
+        assert self.db.get_product_stock(1) == 7, "Stock update should have been rolled back"
+        assert self.db.user_exists('tx'), "Nested delete should have been rolled back"
+
+    # Verify that a write waits for another writer's lock instead of failing
+    @pytest.mark.db
+    @pytest.mark.integration
+    def test_write_waits_for_concurrent_writer(self):
+        assert self.db.get_product_stock(1) == 10
+        locked = threading.Event()
+
+        def hold_write_lock():
+            with closing(sqlite3.connect(self.db_path)) as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('UPDATE products SET stock = 1 WHERE id = 1')
+                locked.set()
+                time.sleep(0.3)
+                conn.commit()
+
+        writer = threading.Thread(target=hold_write_lock)
+        writer.start()
+        locked.wait()
+        assert self.db.update_product_stock(1, 25) == 1
+        writer.join()
+
+        assert self.db.get_product_stock(1) == 25
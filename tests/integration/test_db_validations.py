@@ -15,11 +15,10 @@ class TestDatabaseValidations:
         self.products_api = ProductsAPI()
         self.orders_api = OrdersAPI()
 
-    # Cleanup after each test
+    # Cleanup after each test: restore the database captured when the session started
     @pytest.fixture(scope="function")
-    def cleanup_after_test(self):
+    def cleanup_after_test(self, restore_database):
         yield
-        self.db.reset_product_stocks()
 
     # Verify that the user is created in the database
     @pytest.mark.integration
@@ -39,10 +38,10 @@ class TestDatabaseValidations:
         
         db_user = self.db.get_user_by_username(user_data['username'])
         assert db_user is not None, "User was not created in the database."
-        assert db_user[1] == user_data['username']
-        assert db_user[2] == user_data['email']
-        assert db_user[3] == user_data['first_name']
-        assert db_user[4] == user_data['last_name']
+        assert db_user.username == user_data['username']
+        assert db_user.email == user_data['email']
+        assert db_user.first_name == user_data['first_name']
+        assert db_user.last_name == user_data['last_name']
 
     # Verify that the product stock is updated in the database
     @pytest.mark.integration
@@ -81,8 +80,8 @@ class TestDatabaseValidations:
 
         db_order = self.db.get_order_details(order_id)
         assert db_order is not None, "Order was not created in the database."
-        assert db_order[1] == user_id, "Order was not created for the correct user."
-        assert db_order[3] == "completed", "Order was not completed."
+        assert db_order.user_id == user_id, "Order was not created for the correct user."
+        assert db_order.status == "completed", "Order was not completed."
 
         # Verify that the order item was created
         items_count = self.db.get_order_items_count(order_id)
@@ -98,17 +97,18 @@ class TestDatabaseValidations:
     # Verify that multiple orders are created in the database and the product stock is updated
     @pytest.mark.integration
     def test_multiple_orders_stock_tracking(self, cleanup_after_test):
-        response1, _ = self.users_api.create_valid_user()
-        user_id_1 = response1.json()['id']
-
-        response2, _ = self.users_api.create_valid_user()
-        user_id_2 = response2.json()['id']
+        users = self.users_api.create_users_concurrently(2)
+        assert users['created'] == 2, f"Users were not created: {users['results']}"
+        user_id_1, user_id_2 = (result['response'].json()['id'] for result in users['results'])
 
         product_id = 1
         initial_stock = self.db.get_product_stock(product_id)
 
-        order1_response = self.orders_api.create_simple_order(user_id_1, product_id, 2)
-        order2_response = self.orders_api.create_simple_order(user_id_2, product_id, 3)
+        orders = self.orders_api.create_orders_concurrently([
+            {"user_id": user_id_1, "product_id": product_id, "quantity": 2},
+            {"user_id": user_id_2, "product_id": product_id, "quantity": 3},
+        ])
+        order1_response, order2_response = (result['response'] for result in orders['results'])
 
         assert order1_response.status_code == 201
         assert order2_response.status_code == 201
@@ -142,4 +142,31 @@ class TestDatabaseValidations:
 
         stock_after_failed_order = self.db.get_product_stock(product_id)
         assert stock_after_failed_order == stock_before_failed_order, \
-            f"Product stock was updated in the database. Expected: {stock_before_failed_order}. Actual: {stock_after_failed_order}"
\ No newline at end of file
+            f"Product stock was updated in the database. Expected: {stock_before_failed_order}. Actual: {stock_after_failed_order}"
+
+    # Verify that concurrent orders for the same product never oversell it
+    @pytest.mark.integration
+    @pytest.mark.regression
+    def test_concurrent_orders_do_not_oversell(self, cleanup_after_test):
+        response, _ = self.users_api.create_valid_user()
+        user_id = response.json()['id']
+
+        product_id = 1
+        available_stock = 5
+        concurrent_orders = 20
+        self.products_api.update_product_stock(product_id, available_stock)
+
+        orders = self.orders_api.create_orders_concurrently(
+            [{"user_id": user_id, "product_id": product_id, "quantity": 1}] * concurrent_orders,
+            max_workers=concurrent_orders)
+        assert not any(result['error'] for result in orders['results']), orders['results']
+        status_codes = [result['response'].status_code for result in orders['results']]
+
+        assert status_codes.count(201) == available_stock, \
+            f"Expected {available_stock} successful orders. Actual: {status_codes.count(201)}"
+        assert status_codes.count(400) == concurrent_orders - available_stock, \
+            f"Expected the remaining orders to be rejected for stock. Status codes: {status_codes}"
+
+        final_stock = self.db.get_product_stock(product_id)
+        assert final_stock == 0, \
+            f"Product stock was oversold. Expected: 0. Actual: {final_stock}"
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+from api.endpoints.users_api import UsersAPI
+from api.isolated_server import IsolatedServer
+from utils.db_utils import DatabaseUtils
+from utils.helpers import TestHelpers
+
+class TestIsolatedServer:
+
+    # Start a private server on a clone of a small template database
+    @pytest.fixture(autouse=True)
+    def setup(self, fresh_db):
+        self.template = fresh_db(users=5, products=3, orders=5, seed=3)
+        self.server = IsolatedServer(template_db=self.template.db_path, threads=2).start()
+        yield
+        self.server.stop()
+
+    # Verify that writes through the private server land in its clone only
+    @pytest.mark.live
+    @pytest.mark.integration
+    def test_server_uses_its_own_database(self):
+        assert self.server.db_path != self.template.db_path
+        users_api = UsersAPI(base_url=self.server.base_url)
+        clone = DatabaseUtils(self.server.db_path)
+        assert clone.get_user_count() == 5, "Clone should start with the template's rows"
+
+        user_data = TestHelpers.generate_test_user()
+        response = users_api.create_user(user_data)
+
+        users_api.validate_status_code(response, 201)
+        assert clone.user_exists(user_data['username'])
+        assert not self.template.user_exists(user_data['username'])
+        clone.close()
+
+    # Verify that stopping the server removes its database
+    @pytest.mark.live
+    @pytest.mark.integration
+    def test_stop_removes_database(self):
+        directory = self.server.directory
+        self.server.stop()
+
+        assert not os.path.exists(directory)
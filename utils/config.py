@@ -10,6 +10,11 @@ class Config:
     IMPLICIT_WAIT = int(os.getenv("IMPLICIT_WAIT", 10))
     EXPLICIT_WAIT = int(os.getenv("EXPLICIT_WAIT", 20))
 
+    # Mock API server and its database. conftest.py repoints both at a private
+    # server when each pytest-xdist worker gets its own
+    MOCK_API_URL = os.getenv("MOCK_API_URL", "http://localhost:5000/api")
+    DB_PATH = os.getenv("DB_PATH", "ecommerce_test.db")
+
     # User credentials
     VALID_USER = "standard_user"
     VALID_PASSWORD = "secret_sauce"
@@ -0,0 +1,72 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from utils.schema import touch_products
+
+# Golden copies of a database for constant-time resets between tests.
+#
+# capture() copies the database with the sqlite3 backup API into an in-memory
+# database (or a file in `location`, e.g. a tmpfs such as /dev/shm), and
+# restore() copies it back page by page. A restore costs a pass over the file
+# whatever was written since, unlike DELETE-based cleanup that slows down as the
+# tables grow. Restores go through SQLite's locking, so connections that other
+# processes (such as the mock server) keep open stay valid and see the restored
+# data.
+
+# Directory used for file-backed snapshots when no location is given
+SNAPSHOT_DIR = os.getenv("DB_SNAPSHOT_DIR")
+
+
+class DatabaseSnapshot:
+
+    def __init__(self, db_path, location=SNAPSHOT_DIR):
+        self.db_path = db_path
+        self.location = location
+        self.path = None
+        self._copy = None
+        self._target = None
+        self._lock = threading.Lock()
+
+    # Copy the database as it is now; conn is an open connection to read it through
+    def capture(self, conn=None):
+        if self.location:
+            fd, self.path = tempfile.mkstemp(prefix='snapshot-', suffix='.db', dir=self.location)
+            os.close(fd)
+        self._copy = sqlite3.connect(self.path or ':memory:', check_same_thread=False)
+        source = conn or sqlite3.connect(self.db_path)
+        try:
+            source.backup(self._copy)
+        finally:
+            if conn is None:
+                source.close()
+        return self
+
+    # Put the database back to the captured state and return the time it took in
+    # seconds. conn is an open connection to write through; without one the
+    # snapshot keeps its own. Product modification times move to now, since the
+    # restored data replaces whatever clients saw last.
+    def restore(self, conn=None):
+        if self._copy is None:
+            raise RuntimeError('Snapshot has not been captured')
+        started = time.perf_counter()
+        with self._lock:
+            if conn is None:
+                if self._target is None:
+                    self._target = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+                conn = self._target
+            self._copy.backup(conn)
+            touch_products(conn)
+        return time.perf_counter() - started
+
+    def close(self):
+        with self._lock:
+            for conn in (self._copy, self._target):
+                if conn is not None:
+                    conn.close()
+            self._copy = self._target = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+            self.path = None
@@ -1,23 +1,103 @@
+import argparse
 import sqlite3
+import threading
 from contextlib import contextmanager
 
+from utils import rows, seeder
+from utils.config import Config
+from utils.db_snapshot import SNAPSHOT_DIR, DatabaseSnapshot
+from utils.schema import migrate
+
+# Pragmas applied to every connection DatabaseUtils opens. WAL lets these reads
+# run alongside the mock server's writers, and busy_timeout makes a write wait
+# for the server's lock instead of failing with "database is locked".
+CONNECTION_PRAGMAS = (
+    'PRAGMA busy_timeout = 5000',
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+)
+
 class DatabaseUtils:
-    def __init__(self, db_path='ecommerce_test.db'):
-        self.db_path = db_path
+    # reuse_connections keeps one connection per thread open for the life of the
+    # instance instead of connecting for every query; statement_cache_size sizes
+    # the prepared-statement cache of each connection. typed_rows=False makes the
+    # lookup helpers return plain tuples instead of the row types in utils/rows.py
+    def __init__(self, db_path=None, reuse_connections=True, statement_cache_size=128, typed_rows=True):
+        self.db_path = db_path or Config.DB_PATH
+        self.reuse_connections = reuse_connections
+        self.statement_cache_size = statement_cache_size
+        self.typed_rows = typed_rows
+        self._local = threading.local()
+
+    # Open a new connection and apply the tuning pragmas
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5, cached_statements=self.statement_cache_size)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
 
-    # Context manager for database connection
+    # Context manager for database connection. Inside transaction() it yields the
+    # transaction's connection; otherwise the thread's reused connection, or a new
+    # one that is closed afterwards when reuse is off.
     @contextmanager
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = getattr(self._local, 'transaction', None)
+        if conn is not None:
+            yield conn
+            return
+
+        if not self.reuse_connections:
+            conn = self._connect()
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
         try:
             yield conn
         finally:
+            # Never leave a half-finished implicit transaction on a reused connection
+            if conn.in_transaction:
+                conn.rollback()
+
+    # Group writes into one transaction, committed on success and rolled back on error.
+    # The write lock is taken up front (BEGIN IMMEDIATE); nested calls join the outer one.
+    @contextmanager
+    def transaction(self):
+        if getattr(self._local, 'transaction', None) is not None:
+            yield self._local.transaction
+            return
+
+        with self.get_connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            self._local.transaction = conn
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+            finally:
+                self._local.transaction = None
+
+    # Close this thread's reused connection
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
             conn.close()
 
-    # Function to execute a query and return the results
-    def execute_query(self, query, params=None):
+    # Function to execute a query and return the results, as row_type rows
+    # (see utils/rows.py) or, by default, plain tuples
+    def execute_query(self, query, params=None, row_type=None):
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = rows.row_factory(row_type)
             if params:
                 cursor.execute(query, params)
             else:
@@ -32,13 +112,19 @@ class DatabaseUtils:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            conn.commit()
+            # Writes inside transaction() are committed when it ends
+            if getattr(self._local, 'transaction', None) is None:
+                conn.commit()
             return cursor.rowcount
     
+    # Row type for the lookup helpers, or None for plain tuples
+    def _row_type(self, row_type):
+        return row_type if self.typed_rows else None
+
     # Function to get a user by username
     def get_user_by_username(self, username):
         query = 'SELECT * FROM users WHERE username = ?'
-        result = self.execute_query(query, (username,))
+        result = self.execute_query(query, (username,), self._row_type(rows.User))
         return result[0] if result else None
 
     # Function to check if a user exists
@@ -56,6 +142,12 @@ class DatabaseUtils:
         result = self.execute_query(query, (product_id,))
         return result[0][0] if result else None
 
+    # Function to get a product by ID
+    def get_product(self, product_id):
+        query = 'SELECT * FROM products WHERE id = ?'
+        result = self.execute_query(query, (product_id,), self._row_type(rows.Product))
+        return result[0] if result else None
+
     # Function to update the stock of a product
     def update_product_stock(self, product_id, new_stock):
         query = 'UPDATE products SET stock = ? WHERE id = ?'
@@ -69,7 +161,7 @@ class DatabaseUtils:
             JOIN users u ON o.user_id = u.id
             WHERE o.id = ?
         '''
-        result = self.execute_query(query, (order_id,))
+        result = self.execute_query(query, (order_id,), self._row_type(rows.OrderDetails))
         return result[0] if result else None
 
     # Function to get the count of order items
@@ -78,19 +170,29 @@ class DatabaseUtils:
         result = self.execute_query(query, (order_id,))
         return result[0][0] if result else 0
 
+    # Function to get the items of an order with their product names
+    def get_order_items(self, order_id):
+        query = '''
+            SELECT oi.*, p.name
+            FROM order_items oi
+            JOIN products p ON oi.product_id = p.id
+            WHERE oi.order_id = ?
+            ORDER BY oi.id
+        '''
+        return self.execute_query(query, (order_id,), self._row_type(rows.OrderItemDetails))
+
     # Function to get orders by user
     def get_orders_by_user(self, user_id):
         query = 'SELECT * FROM orders WHERE user_id = ?'
-        return self.execute_query(query, (user_id,))
+        return self.execute_query(query, (user_id,), self._row_type(rows.Order))
 
     # Function to cleanup test data
     def cleanup_test_data(self):
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM order_items')
             cursor.execute('DELETE FROM orders')
             cursor.execute('DELETE FROM users WHERE username LIKE "test%"')
-            conn.commit()
 
     def reset_product_stocks(self):
         default_stocks = {
@@ -102,9 +204,62 @@ class DatabaseUtils:
             6: 12
         }
 
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             for product_id, stock in default_stocks.items():
                 cursor.execute('UPDATE products SET stock = ? WHERE id = ?', 
                 (stock, product_id))
-            conn.commit()
\ No newline at end of file
+
+    # Capture the database as it is now (see utils/db_snapshot.py)
+    def snapshot(self, location=SNAPSHOT_DIR):
+        with self.get_connection() as conn:
+            return DatabaseSnapshot(self.db_path, location).capture(conn)
+
+    # Put the database back to a snapshot, whatever was written since
+    def restore(self, snapshot):
+        with self.get_connection() as conn:
+            return snapshot.restore(conn)
+
+    # Bulk-load synthetic users, products and orders (see utils/seeder.py) in one
+    # transaction, creating the schema first if needed. Returns the row counts and
+    # the rows/sec figure.
+    def seed(self, users=0, products=0, orders=0, items_per_order=3, seed=0, chunk_size=seeder.CHUNK_SIZE):
+        with self.get_connection() as conn:
+            migrate(conn)
+            # No fsyncs, and a page cache large enough for the random-order
+            # order ID index, while the load runs
+            conn.execute('PRAGMA synchronous = OFF')
+            conn.execute(f'PRAGMA cache_size = {-seeder.CACHE_KIB}')
+            try:
+                with self.transaction():
+                    return seeder.seed(conn, users=users, products=products, orders=orders,
+                                       items_per_order=items_per_order, seed=seed, chunk_size=chunk_size)
+            finally:
+                conn.execute('PRAGMA synchronous = NORMAL')
+                conn.execute('PRAGMA cache_size = -2000')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Database utilities for the e-commerce test suite')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = commands.add_parser('seed', help='bulk-load synthetic users, products and orders')
+    seed_parser.add_argument('--db', default=Config.DB_PATH)
+    seed_parser.add_argument('--users', type=seeder.parse_count, default=0, help='e.g. 5000, 100k, 1m')
+    seed_parser.add_argument('--products', type=seeder.parse_count, default=0)
+    seed_parser.add_argument('--orders', type=seeder.parse_count, default=0)
+    seed_parser.add_argument('--items-per-order', type=int, default=3)
+    seed_parser.add_argument('--seed', type=int, default=0, help='random seed; the same seed gives the same rows')
+    seed_parser.add_argument('--chunk-size', type=int, default=seeder.CHUNK_SIZE)
+
+    args = parser.parse_args(argv)
+
+    db = DatabaseUtils(args.db)
+    report = db.seed(users=args.users, products=args.products, orders=args.orders,
+                     items_per_order=args.items_per_order, seed=args.seed, chunk_size=args.chunk_size)
+    db.close()
+    print(f"Seeded {report['users']} users, {report['products']} products, {report['orders']} orders and "
+          f"{report['order_items']} order items in {report['seconds']:.1f}s ({report['rows_per_sec']} rows/s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+import math
+import re
+import threading
+from urllib.parse import urlsplit
+
+# Route segments that identify a single resource: integers, UUIDs and long hex IDs
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,})$')
+
+# API collections whose next segment is a resource ID whatever its format,
+# apart from the collection-level actions
+COLLECTIONS = {'users', 'products', 'orders'}
+COLLECTION_ACTIONS = {'bulk'}
+
+
+# Collapse resource IDs in a URL path so /orders/123 and /orders/abc share one route
+def normalize_route(url):
+    path = urlsplit(url).path or '/'
+    segments = path.split('/')
+    for index, segment in enumerate(segments):
+        after_collection = index > 0 and segments[index - 1] in COLLECTIONS
+        if (after_collection and segment and segment not in COLLECTION_ACTIONS) or _ID_SEGMENT.match(segment):
+            segments[index] = '<id>'
+    return '/'.join(segments)
+
+
+# Streaming histogram with logarithmic buckets. Each bucket spans about 2% of its
+# value, so memory stays bounded no matter how many samples are recorded and
+# percentiles are accurate to within that relative error.
+class LatencyHistogram:
+
+    BUCKETS_PER_DOUBLING = 35
+    # Latencies are recorded in microseconds; anything faster lands in the first bucket
+    MIN_MICROS = 1
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _bucket(self, micros):
+        return int(math.log2(max(micros, self.MIN_MICROS)) * self.BUCKETS_PER_DOUBLING)
+
+    def _upper_bound(self, bucket):
+        return 2 ** ((bucket + 1) / self.BUCKETS_PER_DOUBLING)
+
+    # Record one latency in seconds
+    def record(self, seconds):
+        micros = seconds * 1e6
+        bucket = self._bucket(micros)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    # Latency in seconds below which `percentile` percent of the samples fall
+    def percentile(self, percentile):
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percentile / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self._upper_bound(bucket) / 1e6, self.max)
+        return self.max
+
+    # Plain-data form of the histogram, e.g. to send it from a pytest-xdist worker
+    def to_dict(self):
+        return {'buckets': sorted(self.buckets.items()), 'count': self.count,
+                'total': self.total, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.buckets = {bucket: count for bucket, count in data['buckets']}
+        histogram.count = data['count']
+        histogram.total = data['total']
+        histogram.max = data['max']
+        return histogram
+
+    def merge(self, other):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+
+# Histograms per "METHOD /normalized/route" for every call made in this process
+_histograms = {}
+_lock = threading.Lock()
+
+
+def record(method, url, seconds):
+    key = f"{method} {normalize_route(url)}"
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = LatencyHistogram()
+        histogram.record(seconds)
+
+
+# This process's histograms as plain data, keyed by endpoint
+def export():
+    with _lock:
+        return {endpoint: histogram.to_dict() for endpoint, histogram in _histograms.items()}
+
+
+# Add histograms exported by another process (such as a pytest-xdist worker) to this one's
+def merge_exported(exported):
+    with _lock:
+        for endpoint, data in exported.items():
+            histogram = _histograms.get(endpoint)
+            if histogram is None:
+                histogram = _histograms[endpoint] = LatencyHistogram()
+            histogram.merge(LatencyHistogram.from_dict(data))
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+# One row per endpoint, slowest p95 first, with latencies in milliseconds
+def summary():
+    with _lock:
+        histograms = list(_histograms.items())
+    rows = [{
+        'endpoint': endpoint,
+        'count': histogram.count,
+        'p50': histogram.percentile(50) * 1000,
+        'p95': histogram.percentile(95) * 1000,
+        'p99': histogram.percentile(99) * 1000,
+        'max': histogram.max * 1000,
+    } for endpoint, histogram in histograms]
+    return sorted(rows, key=lambda row: row['p95'], reverse=True)
+
+
+# Parse a budget such as "200" or "GET /api/products=50,POST /api/orders=300,250".
+# Entries without an endpoint set the default budget; values are milliseconds.
+def parse_budget(spec):
+    default, per_endpoint = None, {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        endpoint, _, value = entry.rpartition('=')
+        if endpoint:
+            per_endpoint[endpoint.strip()] = float(value)
+        else:
+            default = float(value)
+    return default, per_endpoint
+
+
+# Rows whose latency at `percentile` exceeds the budget, with the budget added
+def over_budget(spec, percentile=95):
+    default, per_endpoint = parse_budget(spec)
+    with _lock:
+        latencies = {endpoint: histogram.percentile(percentile) * 1000
+                     for endpoint, histogram in _histograms.items()}
+    violations = []
+    for row in summary():
+        budget = per_endpoint.get(row['endpoint'], default)
+        if budget is not None and latencies[row['endpoint']] > budget:
+            violations.append(dict(row, budget=budget, latency=latencies[row['endpoint']]))
+    return violations
+
+
+# Render the summary as a fixed-width table
+def format_table(rows):
+    lines = [f"{'endpoint':<45} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    for row in rows:
+        lines.append(f"{row['endpoint']:<45} {row['count']:>7} {row['p50']:>9.2f} "
+                     f"{row['p95']:>9.2f} {row['p99']:>9.2f} {row['max']:>9.2f}")
+    return '\n'.join(lines)
@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+# Logger for API exchanges: INFO logs one line per exchange, DEBUG adds the bodies.
+# Nothing is formatted unless the level is enabled, so the default is nearly free.
+logger = logging.getLogger("api")
+logger.setLevel(os.getenv("API_LOG_LEVEL", "WARNING").upper())
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(_handler)
+    logger.propagate = False
+
+# Fraction of exchanges that reach the logger when INFO or DEBUG is enabled
+SAMPLE_RATE = float(os.getenv("API_LOG_SAMPLE", "1"))
+
+# Most recent exchanges, kept as raw references and only formatted by dump()
+BUFFER_SIZE = int(os.getenv("API_LOG_BUFFER", "200"))
+MAX_BODY_CHARS = 2000
+
+_buffer = deque(maxlen=BUFFER_SIZE)
+_lock = threading.Lock()
+
+
+# Record one exchange in the ring buffer and log it if the level allows.
+# The body of a streamed response belongs to the caller and is not read.
+def record(method, url, response, data=None, params=None, stream=False):
+    elapsed = getattr(response, "elapsed", None)
+    content = None if stream else response.content
+    entry = (time.time(), method, url, params, data, response.status_code,
+             elapsed.total_seconds() if elapsed is not None else None,
+             response.headers, content)
+    with _lock:
+        _buffer.append(entry)
+
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    if SAMPLE_RATE < 1 and random.random() >= SAMPLE_RATE:
+        return
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s %s -> %s\nParams: %s\nData: %s\nResponse: %s", method, url,
+                     response.status_code, params, data, _format_body(content))
+    else:
+        logger.info("%s %s -> %s", method, url, response.status_code)
+
+
+# Pretty-print a JSON body, falling back to the raw text
+def _format_body(content, limit=None):
+    if content is None:
+        return "(streamed, not captured)"
+    text = content.decode("utf-8", errors="replace") if isinstance(content, bytes) else str(content)
+    try:
+        text = json.dumps(json.loads(text), indent=4)
+    except ValueError:
+        pass
+    if limit and len(text) > limit:
+        text = f"{text[:limit]}... ({len(text) - limit} more characters)"
+    return text
+
+
+# Serialize the buffered exchanges, oldest first
+def dump():
+    with _lock:
+        entries = list(_buffer)
+    lines = []
+    for timestamp, method, url, params, data, status, elapsed, headers, content in entries:
+        stamp = time.strftime("%H:%M:%S", time.localtime(timestamp))
+        took = f" ({elapsed * 1000:.1f} ms)" if elapsed is not None else ""
+        lines.append(f"[{stamp}] {method} {url} -> {status}{took}")
+        if params:
+            lines.append(f"Params: {params}")
+        if data:
+            lines.append(f"Data: {json.dumps(data, default=str)[:MAX_BODY_CHARS]}")
+        lines.append(f"Headers: {dict(headers)}")
+        lines.append(f"Response: {_format_body(content, MAX_BODY_CHARS)}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+# Forget the buffered exchanges, e.g. at the start of each test
+def clear():
+    with _lock:
+        _buffer.clear()
+
+
+# Number of exchanges currently buffered
+def size():
+    return len(_buffer)
@@ -0,0 +1,83 @@
+from typing import NamedTuple, Optional
+
+# Typed rows for the e-commerce tables, shared by DatabaseUtils and the mock server.
+#
+# NamedTuples have no per-row __dict__ (they cost what a plain tuple costs),
+# still index like the tuples sqlite3 returns, and are built directly from the
+# row tuple by row_factory. Field order follows the table's column order, so a
+# row type matches `SELECT *` on its table; the *Details types add the columns
+# the usual joins append.
+
+
+class User(NamedTuple):
+    id: int
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+    created_at: Optional[str]
+
+
+class Product(NamedTuple):
+    id: int
+    name: str
+    price: float
+    stock: int
+    description: Optional[str]
+
+
+class Order(NamedTuple):
+    id: str
+    user_id: int
+    total_amount: float
+    status: str
+    created_at: Optional[str]
+
+
+# SELECT o.*, u.username FROM orders o JOIN users u ...
+class OrderDetails(NamedTuple):
+    id: str
+    user_id: int
+    total_amount: float
+    status: str
+    created_at: Optional[str]
+    username: str
+
+
+class OrderItem(NamedTuple):
+    id: int
+    order_id: str
+    product_id: int
+    quantity: int
+    price: float
+
+
+# SELECT oi.*, p.name FROM order_items oi JOIN products p ...
+class OrderItemDetails(NamedTuple):
+    id: int
+    order_id: str
+    product_id: int
+    quantity: int
+    price: float
+    product_name: str
+
+
+_new = tuple.__new__
+_factories = {}
+
+
+# sqlite3 row_factory building `row_type` rows; None keeps plain tuples.
+# Skips NamedTuple._make's length check, so the query must select exactly the
+# row type's columns in order.
+def row_factory(row_type):
+    if row_type is None:
+        return None
+    factory = _factories.get(row_type)
+    if factory is None:
+        factory = _factories[row_type] = lambda cursor, row: _new(row_type, row)
+    return factory
+
+
+# JSON-ready dict of a row, from a typed row or a plain tuple in row_type's column order
+def to_dict(row_type, row):
+    return dict(zip(row_type._fields, row))
@@ -0,0 +1,170 @@
+import sqlite3
+from contextlib import contextmanager
+
+# Versioned schema migrations. Each entry is applied once, in order, and the
+# number of applied entries is tracked in PRAGMA user_version. Append new
+# entries to change the schema; never edit one that has already shipped.
+MIGRATIONS = [
+    # 1: base tables
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            price REAL NOT NULL,
+            stock INTEGER DEFAULT 0,
+            description TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS orders (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER,
+            total_amount REAL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id TEXT,
+            product_id INTEGER,
+            quantity INTEGER,
+            price REAL,
+            FOREIGN KEY (order_id) REFERENCES orders (id),
+            FOREIGN KEY (product_id) REFERENCES products (id)
+        )
+        ''',
+    ],
+    # 2: indexes for the per-user order lookups and the order items joins
+    [
+        'CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders (user_id)',
+        'CREATE INDEX IF NOT EXISTS idx_order_items_order_id ON order_items (order_id)',
+    ],
+    # 3: responses stored per Idempotency-Key so retried order creations are replayed
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            key TEXT PRIMARY KEY,
+            request_hash TEXT NOT NULL,
+            status INTEGER NOT NULL,
+            body TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ],
+    # 4: a token that every write to products replaces, so a cached copy of the
+    # catalog can check it is current whichever connection or process wrote.
+    # It is random rather than a counter: a restored snapshot brings back its own
+    # token, so one token value never stands for two different catalogs.
+    [
+        'CREATE TABLE IF NOT EXISTS catalog_version (id INTEGER PRIMARY KEY CHECK (id = 1), token INTEGER NOT NULL)',
+        'INSERT OR IGNORE INTO catalog_version (id, token) VALUES (1, random())',
+        '''
+        CREATE TRIGGER IF NOT EXISTS products_insert_version AFTER INSERT ON products
+        BEGIN UPDATE catalog_version SET token = random(); END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS products_update_version AFTER UPDATE ON products
+        BEGIN UPDATE catalog_version SET token = random(); END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS products_delete_version AFTER DELETE ON products
+        BEGIN UPDATE catalog_version SET token = random(); END
+        ''',
+    ],
+    # 5: when each product last changed (Unix seconds), sent as Last-Modified.
+    # Triggers keep it current for writes from any connection or process.
+    [
+        'CREATE TABLE IF NOT EXISTS product_modified (product_id INTEGER PRIMARY KEY, modified_at INTEGER NOT NULL)',
+        '''
+        INSERT OR IGNORE INTO product_modified (product_id, modified_at)
+        SELECT id, CAST(strftime('%s', 'now') AS INTEGER) FROM products
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS products_insert_modified AFTER INSERT ON products
+        BEGIN
+            INSERT OR REPLACE INTO product_modified (product_id, modified_at)
+            VALUES (NEW.id, CAST(strftime('%s', 'now') AS INTEGER));
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS products_update_modified AFTER UPDATE ON products
+        BEGIN
+            DELETE FROM product_modified WHERE product_id = OLD.id;
+            INSERT INTO product_modified (product_id, modified_at)
+            VALUES (NEW.id, CAST(strftime('%s', 'now') AS INTEGER));
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS products_delete_modified AFTER DELETE ON products
+        BEGIN DELETE FROM product_modified WHERE product_id = OLD.id; END
+        ''',
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Get the schema version recorded in the database
+def get_schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+# Apply every migration newer than the database's version, one transaction each.
+# Returns the list of versions that were applied.
+def migrate(conn, target=SCHEMA_VERSION):
+    applied = []
+    while get_schema_version(conn) < target:
+        # Re-read the version under the write lock in case another process migrated first
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = get_schema_version(conn)
+            if version >= target:
+                conn.rollback()
+                break
+            for statement in MIGRATIONS[version]:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {version + 1}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied.append(version + 1)
+    return applied
+
+# Mark every product as modified now. A snapshot restore copies older times back,
+# and Last-Modified must not go backwards, or a client holding a newer copy would
+# be told it is still current.
+def touch_products(conn):
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'product_modified'").fetchone():
+        conn.execute("UPDATE product_modified SET modified_at = CAST(strftime('%s', 'now') AS INTEGER)")
+        conn.commit()
+
+# Secondary indexes (the ones created by CREATE INDEX) as (name, sql) pairs
+def secondary_indexes(conn):
+    return conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL ORDER BY name"
+    ).fetchall()
+
+# Drop the secondary indexes for the duration of a bulk load and rebuild them
+# afterwards; one build at the end is much cheaper than updating them per row.
+# Run inside a transaction so an error leaves the indexes as they were.
+@contextmanager
+def deferred_indexes(conn):
+    indexes = secondary_indexes(conn)
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX "{name}"')
+    yield [name for name, _ in indexes]
+    for _, sql in indexes:
+        conn.execute(sql)
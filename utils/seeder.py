@@ -0,0 +1,151 @@
+import itertools
+import random
+import time
+import uuid
+
+from utils.schema import deferred_indexes
+
+# Synthetic data for load and scale testing.
+#
+# Rows are produced by generators and written with executemany in chunks, so
+# memory stays flat however many rows are requested; only a price and a stock
+# counter per seeded product are kept. Orders only take stock that is still
+# left, like the server does, and each product's final stock is its initial
+# stock minus everything its order items sold. The same seed always produces
+# the same rows for the same starting database.
+
+FIRST_NAMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elena', 'Facundo', 'Gabriela', 'Hugo',
+               'Ines', 'Julian', 'Lucia', 'Martin', 'Nora', 'Pablo', 'Sofia', 'Tomas']
+LAST_NAMES = ['Alvarez', 'Benitez', 'Castro', 'Diaz', 'Fernandez', 'Gomez', 'Herrera', 'Lopez',
+              'Martinez', 'Perez', 'Romero', 'Sosa', 'Torres', 'Vega']
+PRODUCT_KINDS = ['Backpack', 'Bike Light', 'T-Shirt', 'Fleece Jacket', 'Onesie', 'Cap', 'Mug', 'Sticker']
+
+CHUNK_SIZE = 50_000
+# SQLite page cache used while seeding, in KiB
+CACHE_KIB = 256 * 1024
+MAX_QUANTITY = 3
+# Created-at timestamps are spread over the year before this instant
+EPOCH = 1_767_225_600  # 2026-01-01 00:00:00 UTC
+YEAR = 365 * 24 * 3600
+
+
+# Parse a row count such as "5000", "100k" or "1.5m"
+def parse_count(value):
+    value = str(value).strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip('km')) * multiplier)
+
+
+def chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Timestamps are built from an hour of the year and a second within the hour, both
+# formatted once up front; strftime per row would dominate the generation time
+HOURS = [time.strftime('%Y-%m-%d %H:', time.gmtime(EPOCH - YEAR + hour * 3600)) for hour in range(YEAR // 3600)]
+SECONDS = [f'{second // 60:02d}:{second % 60:02d}' for second in range(3600)]
+
+
+# rng.random() is much cheaper than randrange/choice, which matters at millions of rows
+def _pick(rng, values):
+    return values[int(rng.random() * len(values))]
+
+
+def _timestamp(rng):
+    return _pick(rng, HOURS) + _pick(rng, SECONDS)
+
+
+def _next_id(conn, table):
+    return conn.execute(f'SELECT COALESCE(MAX(id), 0) + 1 FROM {table}').fetchone()[0]
+
+
+def user_rows(rng, first_id, count):
+    for user_id in range(first_id, first_id + count):
+        yield (user_id, f'seed{user_id}', f'seed{user_id}@example.com',
+               _pick(rng, FIRST_NAMES), _pick(rng, LAST_NAMES), _timestamp(rng))
+
+
+def product_rows(first_id, prices, stocks):
+    for offset, (price, stock) in enumerate(zip(prices, stocks)):
+        product_id = first_id + offset
+        yield (product_id, f'{PRODUCT_KINDS[product_id % len(PRODUCT_KINDS)]} #{product_id}',
+               price, stock, 'Seeded product')
+
+
+# Pick the items of one order, taking only stock that is left
+def _order_items(rng, product_count, items_per_order, remaining):
+    picked = {}
+    random = rng.random
+    for _ in range(items_per_order):
+        index = int(random() * product_count)
+        quantity = min(int(random() * MAX_QUANTITY) + 1, remaining[index])
+        if quantity and index not in picked:
+            remaining[index] -= quantity
+            picked[index] = quantity
+    return picked
+
+
+# Insert users, products and orders with their items into an open transaction.
+# Orders reference the users and products seeded by the same call.
+def seed(conn, users=0, products=0, orders=0, items_per_order=3, seed=0, chunk_size=CHUNK_SIZE):
+    if orders and not (users and products):
+        raise ValueError("Seeding orders requires seeding users and products in the same call")
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    first_user = _next_id(conn, 'users')
+    first_product = _next_id(conn, 'products')
+    counts = {'users': users, 'products': products, 'orders': 0, 'order_items': 0}
+
+    # Enough initial stock for the expected demand, with some left over
+    demand = orders * items_per_order * (MAX_QUANTITY + 1) / 2 / max(products, 1)
+    prices = [round(rng.uniform(1, 200), 2) for _ in range(products)]
+    initial = [rng.randint(int(demand * 1.1) + 5, int(demand * 1.5) + 50) for _ in range(products)]
+    remaining = list(initial)
+
+    with deferred_indexes(conn):
+        for chunk in chunks(user_rows(rng, first_user, users), chunk_size):
+            conn.executemany('''
+                INSERT INTO users (id, username, email, first_name, last_name, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', chunk)
+        for chunk in chunks(product_rows(first_product, prices, initial), chunk_size):
+            conn.executemany('INSERT INTO products (id, name, price, stock, description) VALUES (?, ?, ?, ?, ?)',
+                             chunk)
+
+        for chunk_start in range(0, orders, chunk_size):
+            order_rows, item_rows = [], []
+            for _ in range(min(chunk_size, orders - chunk_start)):
+                picked = _order_items(rng, products, items_per_order, remaining)
+                if not picked:
+                    continue
+                order_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+                total = 0.0
+                for index, quantity in picked.items():
+                    item_rows.append((order_id, first_product + index, quantity, prices[index]))
+                    total += prices[index] * quantity
+                order_rows.append((order_id, first_user + int(rng.random() * users), round(total, 2),
+                                   'completed', _timestamp(rng)))
+            conn.executemany('''
+                INSERT INTO orders (id, user_id, total_amount, status, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', order_rows)
+            conn.executemany('INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, ?, ?)',
+                             item_rows)
+            counts['orders'] += len(order_rows)
+            counts['order_items'] += len(item_rows)
+
+        # Stock left after the order history
+        for chunk in chunks(((stock, first_product + index) for index, stock in enumerate(remaining)
+                             if stock != initial[index]), chunk_size):
+            conn.executemany('UPDATE products SET stock = ? WHERE id = ?', chunk)
+
+    seconds = time.perf_counter() - started
+    rows = sum(counts.values())
+    return dict(counts, rows=rows, seconds=round(seconds, 3),
+                rows_per_sec=round(rows / seconds) if seconds else rows,
+                units_sold=sum(initial) - sum(remaining))